@@ -1,19 +1,31 @@
-import json
 import logging
 import os
 import redis
-from datetime import datetime
+import redis.asyncio
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from groq import Groq
-from pymongo import MongoClient
+from fastapi.responses import ORJSONResponse
+from pymongo import ASCENDING, AsyncMongoClient, MongoClient
 
 import app.context as context
 from app.routes import (
-    category, source, score, search, nearby,
-    query, simulate, trending
+    category, source, score, search, semantic, nearby,
+    query, simulate, trending, stats, events
 )
+from app.services.embeddings import create_encoder
+from app.services.event_buffer import EventBuffer
+from app.services.geo_index import build_article_index, build_event_index
+from app.services.llm_cache import LLMCache
+from app.services.llm_gateway import CircuitBreaker, LLMGateway
+from app.services.llm_providers import create_llm_client
+from app.services.load_data import missing_article_indexes
+from app.services.query_understanding import QueryUnderstanding, QueryVocabulary
+from app.services.search_backend import create_search_backend
+from app.services.summary_metrics import SummaryMetrics
+from app.services.trending_engine import TrendingEngine
+from app.services.vector_index import VectorIndex
 
 
 class App:
@@ -22,16 +34,36 @@ class App:
             title="Contextual News Retrieval",
             version="1.0",
             description="LLM-powered news retrieval backend",
-            docs_url="/docs"
+            docs_url="/docs",
+            default_response_class=ORJSONResponse,
+            lifespan=self._lifespan
         )
         self._setup_logging()
         self._load_env()
+        self._configure_io_mode()
         self._connect_to_mongo()
         self._connect_to_redis()
         self._init_llm_client()
-        self._load_news_data_if_needed()
+        self._init_summary_cache()
+        self._init_summary_concurrency()
+        self._verify_articles()
+        self._ensure_event_indexes()
+        self._init_geo_indexes()
+        self._init_search_backend()
+        self._init_semantic_index()
+        self._init_trending_engine()
+        self._init_event_buffer()
+        self._init_query_understanding()
         self._register_routes()
 
+    @asynccontextmanager
+    async def _lifespan(self, _app):
+        context.event_buffer.start()
+        context.search_backend.start()
+        yield
+        await context.search_backend.stop()
+        await context.event_buffer.stop()
+
     def _load_env(self):
         load_dotenv(dotenv_path="configs/.env")
         self.logger.info("[App] Loaded Environment Variables.")
@@ -41,6 +73,11 @@ class App:
         self.logger = logging.getLogger("NewsAPI")
         self.logger.info("[App] Setup Logger.")
 
+    def _configure_io_mode(self):
+        # ASYNC_MODE=false keeps the blocking PyMongo / redis-py / Groq clients (run in the threadpool) for comparison
+        context.async_mode = os.getenv("ASYNC_MODE", "true").lower() == "true"
+        self.logger.info(f"[App] Using {'async' if context.async_mode else 'sync'} I/O clients.")
+
     def _connect_to_mongo(self):
         mongo_uri = os.getenv("MONGO_URI")
         db_name = os.getenv("DB_NAME")
@@ -52,60 +89,213 @@ class App:
             self.logger.error(f"[App] Failed to connect to MongoDB: {str(e)}")
             raise
 
+        # The sync client is always kept for startup tasks such as loading data and building indexes
         self.db = self.client[db_name]
         self.articles_collection = self.db["articles"]
-        context.db = self.db
-        context.articles_collection = self.articles_collection
-        context.user_events_collection = self.db["user_events"]
+
+        db = AsyncMongoClient(mongo_uri)[db_name] if context.async_mode else self.db
+        context.db = db
+        context.articles_collection = db["articles"]
+        context.user_events_collection = db["user_events"]
 
     def _connect_to_redis(self):
         redis_url = os.getenv("REDIS_URL")
 
         try:
-            context.redis_client = redis.StrictRedis.from_url(redis_url, decode_responses=True)
+            redis_module = redis.asyncio if context.async_mode else redis
+            context.redis_client = redis_module.StrictRedis.from_url(redis_url, decode_responses=True)
             self.logger.info(f"[App] Connected to Redis at '{redis_url}'")
         except Exception as e:
             self.logger.error(f"[App] Failed to connect to Redis: {str(e)}")
             raise
 
     def _init_llm_client(self):
-        groq_api_key = os.getenv("GROQ_API_KEY")
-        context.llm_client = Groq(api_key=groq_api_key)
-        self.logger.info("[App] Initialized LLM client.")
-
-    def _load_news_data_if_needed(self):
-        self.logger.info("[App] Loading article data into MongoDB...")
-        if self.articles_collection.count_documents({}) == 0:
-            with open("data/news_data.json", "r", encoding="utf-8") as f:
-                articles = json.load(f)
-
-            for article in articles:
-                if "publication_date" in article:
-                    article["publication_date"] = datetime.fromisoformat(article["publication_date"])
-
-            self.articles_collection.insert_many(articles)
-            self.logger.info(f"[App] Inserted {len(articles)} articles into MongoDB.")
-
-            # Create text index on title and description
-            self.logger.info("[App] Creating text index on articles collection...")
-            self.articles_collection.create_index(
-                [("title", "text"), ("description", "text")],
-                name="TextIndex"
+        # LLM_PROVIDER: groq (default), openai (an OpenAI-compatible local endpoint) or fake (load tests)
+        llm_provider = os.getenv("LLM_PROVIDER", "groq").lower()
+        context.llm_client = create_llm_client(llm_provider, context.async_mode, {
+            "groq_api_key": os.getenv("GROQ_API_KEY"),
+            "base_url": os.getenv("LLM_BASE_URL"),
+            "api_key": os.getenv("LLM_API_KEY"),
+            "model": os.getenv("LLM_MODEL"),
+            "timeout_seconds": os.getenv("LLM_TIMEOUT_SECONDS"),
+            "fake_latency": os.getenv("FAKE_LLM_LATENCY"),
+            "fake_token_ms": os.getenv("FAKE_LLM_TOKEN_MS"),
+            "fake_error_rate": os.getenv("FAKE_LLM_ERROR_RATE"),
+            "fake_seed": os.getenv("FAKE_LLM_SEED"),
+        })
+
+        # Defaults match Groq's free-tier quotas for llama-3.1-8b-instant; 0 disables a limit
+        context.llm_gateway = LLMGateway(
+            context.llm_client,
+            requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30")),
+            tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "6000")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY_SECONDS", "0.5")),
+            max_queue_seconds=float(os.getenv("LLM_MAX_QUEUE_SECONDS", "30")),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+                reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
             )
-            self.logger.info("[App] Text index created successfully.")
+        )
+        self.logger.info(f"[App] Initialized {llm_provider} LLM client and gateway.")
 
+    def _init_summary_cache(self):
+        context.summary_cache = LLMCache(
+            max_size=int(os.getenv("SUMMARY_CACHE_MAX_SIZE", "10000")),
+            local_ttl_seconds=int(os.getenv("SUMMARY_CACHE_LOCAL_TTL_SECONDS", "3600")),
+            redis_ttl_seconds=int(os.getenv("SUMMARY_CACHE_TTL_SECONDS", "604800")),
+            bypass=os.getenv("SUMMARY_CACHE_BYPASS", "false").lower() == "true"
+        )
+        self.logger.info("[App] Initialized summary cache.")
+
+    def _init_summary_concurrency(self):
+        # Concurrent LLM calls are bounded by the gateway (LLM_MAX_CONCURRENCY)
+        context.summary_deadline_seconds = float(os.getenv("SUMMARY_DEADLINE_SECONDS", "5"))
+        # Articles per summarization prompt; 1 summarizes each article with its own prompt
+        context.summary_batch_size = max(1, int(os.getenv("SUMMARY_BATCH_SIZE", "1")))
+        context.summary_metrics = SummaryMetrics(context.summary_batch_size)
+        self.logger.info(f"[App] Summarizing {context.summary_batch_size} article(s) per prompt.")
+
+    def _verify_articles(self):
+        # Data and article indexes are managed by `python manage.py load`; startup only checks them
+        count = self.articles_collection.estimated_document_count()
+        if count == 0:
+            self.logger.warning("[App] The articles collection is empty; run `python manage.py load <data file>`.")
         else:
-            self.logger.info("[App] MongoDB already contains article data.")
+            self.logger.info(f"[App] Articles collection holds about {count} articles.")
+
+        missing = missing_article_indexes(self.articles_collection)
+        if missing:
+            self.logger.warning(
+                f"[App] Missing article indexes {missing}; run `python manage.py load --indexes-only`."
+            )
+        else:
+            self.logger.info("[App] Article indexes are ready.")
+
+    def _ensure_event_indexes(self):
+        events_collection = self.db["user_events"]
+
+        # Backfill GeoJSON points for events recorded before trending used $geoNear
+        result = events_collection.update_many(
+            {"geo": {"$exists": False}, "location.lat": {"$type": "number"}, "location.lon": {"$type": "number"}},
+            [{"$set": {"geo": {"type": "Point", "coordinates": ["$location.lon", "$location.lat"]}}}]
+        )
+        if result.modified_count:
+            self.logger.info(f"[App] Added GeoJSON geo to {result.modified_count} user events.")
+
+        events_collection.create_index([("geo", "2dsphere"), ("timestamp", ASCENDING)], name="EventGeoTimeIndex")
+
+        # EVENTS_TTL_HOURS > 0 turns the timestamp index into a TTL index for retention
+        ttl_hours = float(os.getenv("EVENTS_TTL_HOURS", "0"))
+        ttl_options = {"expireAfterSeconds": int(ttl_hours * 3600)} if ttl_hours > 0 else {}
+        existing = events_collection.index_information().get("EventTimestampIndex")
+        if existing is not None and existing.get("expireAfterSeconds") != ttl_options.get("expireAfterSeconds"):
+            events_collection.drop_index("EventTimestampIndex")
+        events_collection.create_index([("timestamp", ASCENDING)], name="EventTimestampIndex", **ttl_options)
+
+        self.logger.info(f"[App] user_events indexes are ready (TTL: {ttl_hours or 'disabled'} hours).")
+
+    def _init_geo_indexes(self):
+        # NEARBY_BACKEND / TRENDING_BACKEND=memory answer radius queries from in-process grid indexes
+        context.nearby_backend = os.getenv("NEARBY_BACKEND", "mongo").lower()
+        context.trending_backend = os.getenv("TRENDING_BACKEND", "aggregate").lower()
+        context.trending_window_hours = float(os.getenv("TRENDING_WINDOW_HOURS", "24"))
+        cell_degrees = float(os.getenv("GEO_INDEX_CELL_DEGREES", "1.0"))
+
+        if context.nearby_backend == "memory":
+            articles = self.articles_collection.find({}, {"_id": 1, "latitude": 1, "longitude": 1})
+            context.article_geo_index = build_article_index(articles, cell_degrees)
+
+        if context.trending_backend == "memory":
+            events = self.db["user_events"].find(
+                {}, {"article_id": 1, "event_type": 1, "timestamp": 1, "location": 1}
+            )
+            context.event_geo_index = build_event_index(events, cell_degrees)
+
+        self.logger.info(f"[App] Nearby backend: {context.nearby_backend}, trending backend: {context.trending_backend}.")
+
+    def _init_search_backend(self):
+        # SEARCH_BACKEND: mongo ($text index) | bm25 (in-process inverted index)
+        backend = os.getenv("SEARCH_BACKEND", "mongo").lower()
+        candidate_cap = int(os.getenv("SEARCH_CANDIDATE_CAP", "1000"))
+        refresh_seconds = float(os.getenv("BM25_REFRESH_SECONDS", "60"))
+        context.search_backend = create_search_backend(backend, self.articles_collection, candidate_cap, refresh_seconds)
+        self.logger.info(f"[App] Using {context.search_backend.name} search backend.")
+
+    def _init_semantic_index(self):
+        if os.getenv("SEMANTIC_SEARCH", "true").lower() != "true":
+            return
+
+        # SEMANTIC_ENCODER: hashing[:<dimensions>] | sentence-transformers[:<model name>]
+        encoder = create_encoder(os.getenv("SEMANTIC_ENCODER", "hashing"))
+        path = os.getenv("SEMANTIC_INDEX_PATH", "data/embeddings")
+        # Only memory-maps the index written by `manage.py embed`; the corpus is never embedded at startup
+        index = VectorIndex.load(path)
+        if index is None or index.encoder != encoder.name:
+            self.logger.warning(
+                f"[App] No {encoder.name} embeddings at {path}; run `python manage.py embed`. Semantic search disabled."
+            )
+            return
+        self.logger.info(f"[App] Loaded {len(index)} {index.encoder} embeddings from {path}.")
+
+        context.query_encoder = encoder
+        context.semantic_index = index
+
+    def _init_trending_engine(self):
+        if context.trending_backend != "engine":
+            return
+
+        context.trending_engine = TrendingEngine(
+            cell_degrees=float(os.getenv("TRENDING_CELL_DEGREES", "0.25")),
+            half_life_hours=float(os.getenv("TRENDING_HALF_LIFE_HOURS", "6"))
+        )
+        events = self.db["user_events"].find(
+            {}, {"article_id": 1, "event_type": 1, "timestamp": 1, "location": 1}
+        )
+        context.trending_engine.record_events(events)
+        self.logger.info(f"[App] Seeded trending engine with {context.trending_engine.events_recorded} events.")
+
+    def _init_event_buffer(self):
+        context.event_buffer = EventBuffer(
+            max_batch_size=int(os.getenv("EVENT_BUFFER_BATCH_SIZE", "1000")),
+            flush_interval_seconds=float(os.getenv("EVENT_BUFFER_FLUSH_INTERVAL_SECONDS", "1")),
+            max_pending=int(os.getenv("EVENT_BUFFER_MAX_PENDING", "100000")),
+            enqueue_timeout_seconds=float(os.getenv("EVENT_BUFFER_ENQUEUE_TIMEOUT_SECONDS", "2"))
+        )
+        self.logger.info("[App] Initialized event write buffer.")
+
+    def _init_query_understanding(self):
+        vocabulary = QueryVocabulary(
+            categories=self.articles_collection.distinct("category"),
+            sources=self.articles_collection.distinct("source_name")
+        )
+        extraction_cache = LLMCache(
+            max_size=int(os.getenv("EXTRACTION_CACHE_MAX_SIZE", "10000")),
+            local_ttl_seconds=int(os.getenv("EXTRACTION_CACHE_LOCAL_TTL_SECONDS", "3600")),
+            redis_ttl_seconds=int(os.getenv("EXTRACTION_CACHE_TTL_SECONDS", "86400")),
+            bypass=os.getenv("EXTRACTION_CACHE_BYPASS", "false").lower() == "true"
+        )
+        context.query_understanding = QueryUnderstanding(
+            vocabulary,
+            extraction_cache,
+            fast_path_enabled=os.getenv("QUERY_FAST_PATH", "true").lower() == "true"
+        )
+        context.query_branch_timeout_seconds = float(os.getenv("QUERY_BRANCH_TIMEOUT_SECONDS", "3"))
+        self.logger.info("[App] Initialized query understanding (fast path + extraction cache).")
 
     def _register_routes(self):
         self._app.include_router(category.router, prefix="/api/v1/news")
         self._app.include_router(source.router, prefix="/api/v1/news")
         self._app.include_router(score.router, prefix="/api/v1/news")
         self._app.include_router(search.router, prefix="/api/v1/news")
+        self._app.include_router(semantic.router, prefix="/api/v1/news")
         self._app.include_router(nearby.router, prefix="/api/v1/news")
         self._app.include_router(query.router, prefix="/api/v1/news")
         self._app.include_router(simulate.router, prefix="/api/v1/news")
         self._app.include_router(trending.router, prefix="/api/v1/news")
+        self._app.include_router(stats.router, prefix="/api/v1/news")
+        self._app.include_router(events.router, prefix="/api/v1/news")
 
     def get_app(self):
         return self._app
\ No newline at end of file
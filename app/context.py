@@ -1,5 +1,23 @@
+async_mode = True
 llm_client = None
+llm_gateway = None
 redis_client = None
 db = None
 articles_collection = None
-user_events_collection = None
\ No newline at end of file
+user_events_collection = None
+summary_cache = None
+search_backend = None
+query_encoder = None
+semantic_index = None
+query_understanding = None
+query_branch_timeout_seconds = None
+summary_deadline_seconds = None
+summary_batch_size = 1
+summary_metrics = None
+nearby_backend = "mongo"
+trending_backend = "aggregate"
+trending_window_hours = 24
+article_geo_index = None
+event_geo_index = None
+trending_engine = None
+event_buffer = None
\ No newline at end of file
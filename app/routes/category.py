@@ -1,9 +1,13 @@
 import logging
+from typing import Optional
 
 from fastapi import APIRouter, Query, HTTPException
 
-import app.context as context
-from app.services.llm import generate_summary
+from app.schemas import ArticlePage
+from app.services.articles import category_filter, find_by_category, format_article
+from app.services.llm import stored_summaries, summarize_articles
+from app.services.pagination import InvalidCursor, count_total
+from app.services.sse import summary_stream_response
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("[category]")
@@ -11,46 +15,34 @@ logger = logging.getLogger("[category]")
 router = APIRouter()
 
 
-@router.get("/category")
-def get_articles_by_category(
+@router.get("/category", response_model=ArticlePage)
+async def get_articles_by_category(
     value: list[str] = Query(..., description="News categories to filter articles by"),
-    limit: int = Query(5, ge=1, le=20, description="Number of articles to return")
+    limit: int = Query(5, ge=1, le=20, description="Number of articles to return"),
+    fuzzy: bool = Query(False, description="Match substrings instead of exact (case-insensitive) names"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also count matching articles"),
+    stream: bool = Query(False, description="Stream summaries as Server-Sent Events")
 ):
     try:
-        category_values = [v.lower() for v in value]
-        query = {
-            "category": {
-                "$elemMatch": {
-                    "$regex": "|".join(category_values),
-                    "$options": "i"
-                }
-            }
-        }
-
-        logger.info(f"CATEGORY | Fetching articles for category: {category_values}")
-        results = context.articles_collection.find(
-            query
-        ).sort("publication_date", -1).limit(limit)
-
-        articles = []
-        for article in results:
-            articles.append({
-                "_id": str(article.get("_id")),
-                "title": article.get("title"),
-                "description": article.get("description"),
-                "url": article.get("url"),
-                "publication_date": article.get("publication_date"),
-                "source_name": article.get("source_name"),
-                "category": article.get("category"),
-                "relevance_score": article.get("relevance_score"),
-                "latitude": article.get("latitude"),
-                "longitude": article.get("longitude"),
-                "llm_summary": generate_summary(article.get("title", ""), article.get("description", ""))
-            })
+        logger.info(f"CATEGORY | Fetching articles for category: {value}")
+        results, next_cursor = await find_by_category(value, limit, cursor, fuzzy)
+        summaries = stored_summaries(results) if stream else await summarize_articles(results)
+
+        articles = [format_article(article, summary) for article, summary in zip(results, summaries)]
         logger.info(f"CATEGORY | Fetched {len(articles)} articles.")
 
-        return {"articles": articles}
+        metadata = {"limit": limit, "next_cursor": next_cursor}
+        if include_total:
+            metadata.update(await count_total(category_filter(value, fuzzy)))
+
+        page = {"articles": articles, "metadata": metadata}
+        if stream:
+            return summary_stream_response(results, page, ArticlePage)
+        return page
 
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"CATEGORY | Error fetching articles by category: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching articles: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,65 @@
+import logging
+from datetime import datetime, timezone
+from typing import List, Literal, Optional, Union
+
+from fastapi import APIRouter, Body, HTTPException
+from pydantic import BaseModel, Field
+
+import app.context as context
+from app.services.event_buffer import EventBufferFull
+from app.services.utils import to_geo_point
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[events]")
+
+router = APIRouter()
+
+MAX_EVENTS_PER_REQUEST = 10000
+
+
+class EventLocation(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+
+
+class UserEvent(BaseModel):
+    article_id: str
+    event_type: Literal["view", "click"]
+    timestamp: Optional[datetime] = None
+    location: EventLocation
+
+    def to_document(self, received_at: datetime) -> dict:
+        timestamp = self.timestamp or received_at
+        if timestamp.tzinfo is not None:
+            # user_events stores naive UTC datetimes
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+        return {
+            "article_id": self.article_id,
+            "event_type": self.event_type,
+            "timestamp": timestamp,
+            "location": {"lat": self.location.lat, "lon": self.location.lon},
+            "geo": to_geo_point(self.location.lat, self.location.lon)
+        }
+
+
+@router.post("/events", status_code=202)
+async def ingest_events(
+    payload: Union[UserEvent, List[UserEvent]] = Body(..., description="A single event or a list of events")
+):
+    events = payload if isinstance(payload, list) else [payload]
+    if len(events) > MAX_EVENTS_PER_REQUEST:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_EVENTS_PER_REQUEST} events per request")
+
+    try:
+        received_at = datetime.utcnow()
+        await context.event_buffer.add_many([event.to_document(received_at) for event in events])
+        return {"accepted": len(events)}
+
+    except EventBufferFull as e:
+        logger.warning(f"EVENTS | Rejecting {len(events)} events: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    except Exception as e:
+        logger.error(f"EVENTS | Error ingesting events: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error ingesting events: {str(e)}")
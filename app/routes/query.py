@@ -1,124 +1,261 @@
+import asyncio
 import logging
 from typing import Optional
 
 from fastapi import APIRouter, Query, HTTPException
 
-from app.routes.category import get_articles_by_category
-from app.routes.nearby import get_articles_nearby
-from app.routes.search import search_articles
-from app.routes.source import get_articles_by_source
-from app.services.llm import generate_summary, extract_entities_and_intent
+import app.context as context
+from app.schemas import QueryPage
+from app.services.aio import run_io
+from app.services.articles import (
+    ARTICLE_PROJECTION, category_filter, format_article, nearby_filter, source_filter, text_filter
+)
+from app.services.llm import stored_summaries, summarize_articles
+from app.services.pagination import (
+    RELEVANCE_SORT, InvalidCursor, check_keyset, count_total, decode_cursor, encode_cursor, find_sorted, sort_values
+)
+from app.services.semantic import HYBRID_SORT, fetch_ranked, hybrid_ranking
+from app.services.sse import summary_stream_response
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("[query]")
 
 router = APIRouter()
 
+# Results are ordered by intent tier (category/source, then search, then nearby) and by
+# relevance within a tier (by hybrid text + semantic score in the search tier when the
+# semantic index is enabled). An article matching several tiers is listed in the first one.
 
-@router.get("/query")
-def smart_query(
+
+async def _matching_ids(query: dict, ids: list) -> set:
+    docs = await run_io(context.articles_collection.find({"$and": [query, {"_id": {"$in": ids}}]}, {"_id": 1}).to_list)
+    return {doc["_id"] for doc in docs}
+
+
+def _filter_fetcher(query: dict):
+    async def fetch(limit: int, after: list | None) -> list:
+        return await find_sorted(query, RELEVANCE_SORT, limit, after, ARTICLE_PROJECTION)
+    return fetch
+
+
+def _ranking_fetcher(ranking: list):
+    # ranking: (_id, hybrid_score) pairs, best first, as ordered by HYBRID_SORT
+    async def fetch(limit: int, after: list | None) -> list:
+        start = 0
+        if after is not None:
+            after_score, after_id = after
+            try:
+                start = next(
+                    (i for i, (key, score) in enumerate(ranking) if (score, key) < (after_score, after_id)),
+                    len(ranking)
+                )
+            except TypeError:
+                raise InvalidCursor("Cursor does not match this sort order")
+        return await fetch_ranked(ranking[start:start + limit], "hybrid_score", ARTICLE_PROJECTION)
+    return fetch
+
+
+# A tier's plan resolves to (filter, fetch, capped): the filter selecting its articles, which
+# later tiers exclude, and the fetcher of its candidates in sort order
+
+
+async def _filter_plan(tier_filter: dict) -> tuple:
+    return tier_filter, _filter_fetcher(tier_filter), False
+
+
+async def _text_plan(search_terms: str) -> tuple:
+    tier_filter, capped = await text_filter(search_terms)
+    return tier_filter, _filter_fetcher(tier_filter), capped
+
+
+async def _hybrid_plan(query: str, search_terms: str | None) -> tuple:
+    ranking = await hybrid_ranking(query, search_terms)
+    return {"_id": {"$in": [key for key, _ in ranking]}}, _ranking_fetcher(ranking), False
+
+
+async def _retrieve_tier(plan, limit: int, after: list | None, exhausted: bool) -> tuple:
+    # The resolved plan and, unless the tier is exhausted, its first `limit` candidates after `after`
+    tier_filter, fetch, capped = await plan
+    batch = [] if exhausted else await fetch(limit, after)
+    return tier_filter, fetch, capped, batch
+
+
+async def _exclude_earlier(fetch, batch: list, sort: list, earlier: list, limit: int) -> list:
+    # Up to `limit` articles of a tier, from its first batch on, skipping articles of earlier tiers
+    articles = []
+    while batch:
+        excluded = set()
+        ids = [a["_id"] for a in batch]
+        for earlier_query in earlier:
+            excluded |= await _matching_ids(earlier_query, ids)
+        articles.extend(a for a in batch if a["_id"] not in excluded)
+
+        if len(articles) >= limit or len(batch) < limit:
+            break
+        batch = await fetch(limit, sort_values(batch[-1], sort))
+
+    return articles[:limit]
+
+
+def _log_failure(branch_names: list, error: BaseException):
+    reason = "timeout" if isinstance(error, asyncio.TimeoutError) else str(error)
+    logger.warning(f"QUERY | Branches {branch_names} failed: {reason}")
+
+
+async def _run_branch(coro) -> list:
+    return await asyncio.wait_for(coro, timeout=context.query_branch_timeout_seconds)
+
+
+@router.get("/query", response_model=QueryPage)
+async def smart_query(
     query: str = Query(..., description="Natural language query"),
     lat: Optional[float] = Query(None, description="User latitude (for nearby search)"),
     lon: Optional[float] = Query(None, description="User longitude (for nearby search)"),
-    page: int = Query(1, ge=1),
-    limit: int = Query(5, ge=1, le=20)
+    limit: int = Query(5, ge=1, le=20),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also estimate the number of matching articles"),
+    stream: bool = Query(False, description="Stream summaries as Server-Sent Events")
 ):
     try:
-        # Extract entities and intent using LLM
-        llm_result = extract_entities_and_intent(query)
+        state = decode_cursor(cursor) if cursor else {"tier": 0, "after": None}
+        if not isinstance(state.get("tier"), int):
+            raise InvalidCursor("Invalid cursor")
+        if state.get("after") is not None:
+            # Every tier sorts on (score, _id)
+            check_keyset(state["after"], len(RELEVANCE_SORT))
+
+        # Extract entities and intent (rule-based fast path, cache, then LLM)
+        llm_result, resolved_by = await context.query_understanding.understand(query)
         entities = llm_result.get("entities", [])
         intents = llm_result.get("intent", [])
         values = llm_result.get("values", {})
 
-        logger.info(f"QUERY | LLM extracted entities: {entities}, intent: {intents}, values: {values}")
-
-        results = []
-
-        # 1. Intent: Search (title/description)
-        if "search" in intents:
-            search_terms = " ".join(entities)
-            res = search_articles(query=search_terms, limit=limit)
-            for a in res.get("articles", []):
-                a["_source"] = "search"
-                results.append(a)
-
-        # 2. Intent: Category match
-        if "category" in intents:
-            category = values.get("category")
-            res = get_articles_by_category(value=category, limit=limit)
-            for a in res.get("articles", []):
-                a["_source"] = "category"
-                results.append(a)
-
-        # 3. Intent: Source name
-        if "source" in intents:
-            source = values.get("source")
-            res = get_articles_by_source(name=source, limit=limit)
-            for a in res.get("articles", []):
-                a["_source"] = "source"
-                results.append(a)
-
-        # 4. Intent: Nearby
-        if "nearby" in intents and lat is not None and lon is not None:
-            res = get_articles_nearby(
-                lat=lat,
-                lon=lon,
-                radius=100,
-                limit=limit
-            )
-            for a in res.get("articles", []):
-                a["_source"] = "nearby"
-                results.append(a)
-
-        # Remove duplicates and sort by intent and relevance
-        unique_articles = {str(a["_id"]): a for a in results}
-        intent_priority = {
-            "category": 1,
-            "source": 1,
-            "search": 2,
-            "nearby": 3
-        }
-        sorted_articles = sorted(
-            unique_articles.values(),
-            key=lambda x: (
-                intent_priority.get(x.get("_source"), 999),
-                -x.get("relevance_score", 0)
-            )
+        logger.info(f"QUERY | Extracted ({resolved_by}) entities: {entities}, intent: {intents}, values: {values}")
+
+        # (tier, branch names, sort, plan) in result order
+        tiers = []
+        failed_branches = []
+        search_terms = " ".join(entities) if "search" in intents and entities else None
+        nearby = "nearby" in intents and lat is not None and lon is not None
+
+        # 1. Intent: Category match / Source name
+        # Fast-path values are exact corpus names; LLM-extracted ones may only be close
+        fuzzy = resolved_by != "fast_path"
+        tier_filters = []
+        tier_branches = []
+        if "category" in intents and values.get("category"):
+            tier_filters.append(category_filter(values["category"], fuzzy))
+            tier_branches.append("category")
+        if "source" in intents and values.get("source"):
+            tier_filters.append(source_filter(values["source"], fuzzy))
+            tier_branches.append("source")
+        if tier_filters:
+            tier_filter = tier_filters[0] if len(tier_filters) == 1 else {"$or": tier_filters}
+            tiers.append((1, tier_branches, RELEVANCE_SORT, _filter_plan(tier_filter)))
+
+        # 2. Intent: Search (title/description), fused with semantic matches of the whole
+        # query when the semantic index is enabled. Semantic matching alone also serves
+        # queries no other tier applies to.
+        if context.semantic_index is not None and (search_terms or not (tier_filters or nearby)):
+            branch_names = ["search", "semantic"] if search_terms else ["semantic"]
+            tiers.append((2, branch_names, HYBRID_SORT, _hybrid_plan(query, search_terms)))
+        elif search_terms:
+            tiers.append((2, ["search"], RELEVANCE_SORT, _text_plan(search_terms)))
+
+        # 3. Intent: Nearby
+        if nearby:
+            tiers.append((3, ["nearby"], RELEVANCE_SORT, _filter_plan(nearby_filter(lat, lon, 100))))
+
+        # Every tier is resolved (including the hybrid ranking) and fetched concurrently, each
+        # only retrieving raw candidates; tiers before the cursor's tier are exhausted and only
+        # resolved, since later tiers still exclude their articles. A tier that fails or times
+        # out is dropped and the page is built from the tiers that completed.
+        retrieved = await asyncio.gather(
+            *(
+                _run_branch(_retrieve_tier(
+                    plan,
+                    limit + 1,
+                    state.get("after") if tier_number == state["tier"] else None,
+                    tier_number < state["tier"]
+                ))
+                for tier_number, _, _, plan in tiers
+            ),
+            return_exceptions=True
         )
 
-        # Pagination
-        start = (page - 1) * limit
-        end = start + limit
-        paginated_articles = sorted_articles[start:end]
-
-        # Format response
-        final_output = []
-        for article in paginated_articles:
-            final_output.append({
-                "title": article.get("title"),
-                "description": article.get("description"),
-                "url": article.get("url"),
-                "publication_date": article.get("publication_date"),
-                "source_name": article.get("source_name"),
-                "category": article.get("category"),
-                "relevance_score": article.get("relevance_score"),
-                "latitude": article.get("latitude"),
-                "longitude": article.get("longitude"),
-                "llm_summary": article.get("llm_summary", generate_summary(article.get("title", ""), article.get("description", ""))),
-            })
+        # (tier, branch names, sort, (filter, fetch, capped, batch)) of the tiers that completed
+        resolved = []
+        for (tier_number, branch_names, sort, _), outcome in zip(tiers, retrieved):
+            if isinstance(outcome, InvalidCursor):
+                raise outcome  # the client's cursor, not a failed branch
+            if isinstance(outcome, BaseException):
+                _log_failure(branch_names, outcome)
+                failed_branches.extend(branch_names)
+                continue
+            resolved.append((tier_number, branch_names, sort, outcome))
+
+        # Once every tier is back, articles listed by an earlier tier are dropped from later
+        # ones, which fetch further candidates if that leaves them short
+        remaining = [(i, tier) for i, tier in enumerate(resolved) if tier[0] >= state["tier"]]
+        outcomes = await asyncio.gather(
+            *(
+                _run_branch(_exclude_earlier(
+                    fetch, batch, sort, [earlier[3][0] for earlier in resolved[:i]], limit + 1
+                ))
+                for i, (_, _, sort, (_, fetch, _, batch)) in remaining
+            ),
+            return_exceptions=True
+        )
+
+        candidates = []
+        for (_, (tier_number, branch_names, _, _)), outcome in zip(remaining, outcomes):
+            if isinstance(outcome, BaseException):
+                _log_failure(branch_names, outcome)
+                failed_branches.extend(branch_names)
+                continue
+            candidates.extend((tier_number, article) for article in outcome)
+
+        page = candidates[:limit]
+        next_cursor = None
+        if len(candidates) > limit:
+            last_tier, last_article = page[-1]
+            tier_sort = next(tier[2] for tier in tiers if tier[0] == last_tier)
+            next_cursor = encode_cursor({"tier": last_tier, "after": sort_values(last_article, tier_sort)})
+
+        # Format response, summarizing only the articles on this page
+        paginated_articles = [article for _, article in page]
+        summaries = stored_summaries(paginated_articles) if stream else await summarize_articles(paginated_articles)
+        final_output = [
+            format_article(article, summary)
+            for article, summary in zip(paginated_articles, summaries)
+        ]
 
         logger.info(f"QUERY | Returning {len(final_output)} articles for query: '{query}'")
 
-        return {
-            "articles": final_output,
-            "metadata": {
-                "total_results": len(sorted_articles),
-                "page": page,
-                "limit": limit,
-                "query": query
-            }
+        metadata = {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "query": query,
+            "understanding": resolved_by,
+            "partial": bool(failed_branches),
+            "failed_branches": failed_branches
         }
+        if include_total:
+            # Upper bound: an article matching several tiers is counted once per tier
+            counts = await asyncio.gather(*(
+                count_total(tier_filter, capped) for _, _, _, (tier_filter, _, capped, _) in resolved
+            ))
+            metadata["total_results"] = sum(c["total_results"] for c in counts)
+            metadata["total_capped"] = any(c["total_capped"] for c in counts)
+            metadata["total_is_estimate"] = len(resolved) > 1
+
+        body = {"articles": final_output, "metadata": metadata}
+        if stream:
+            return summary_stream_response(paginated_articles, body, QueryPage)
+        return body
 
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"QUERY | Error processing query '{query}': {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
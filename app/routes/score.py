@@ -1,9 +1,13 @@
 import logging
+from typing import Optional
 
 from fastapi import APIRouter, Query, HTTPException
 
-import app.context as context
-from app.services.llm import generate_summary
+from app.schemas import ArticlePage
+from app.services.articles import score_filter, find_by_score, format_article
+from app.services.llm import stored_summaries, summarize_articles
+from app.services.pagination import InvalidCursor, count_total
+from app.services.sse import summary_stream_response
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("[score]")
@@ -11,36 +15,33 @@ logger = logging.getLogger("[score]")
 router = APIRouter()
 
 
-@router.get("/score")
-def get_articles_by_score(
+@router.get("/score", response_model=ArticlePage)
+async def get_articles_by_score(
     threshold: float = Query(..., description="Relevance score threshold"),
-    limit: int = Query(5, ge=1, le=20, description="Number of articles to return")
+    limit: int = Query(5, ge=1, le=20, description="Number of articles to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also count matching articles"),
+    stream: bool = Query(False, description="Stream summaries as Server-Sent Events")
 ):
     try:
         logger.info(f"SCORE | Fetching articles with relevance score >= {threshold}")
-        results = context.articles_collection.find(
-            {"relevance_score": {"$gte": threshold}}
-        ).sort("relevance_score", -1).limit(limit)
-
-        articles = []
-        for article in results:
-            articles.append({
-                "_id": str(article.get("_id")),
-                "title": article.get("title"),
-                "description": article.get("description"),
-                "url": article.get("url"),
-                "publication_date": article.get("publication_date"),
-                "source_name": article.get("source_name"),
-                "category": article.get("category"),
-                "relevance_score": article.get("relevance_score"),
-                "latitude": article.get("latitude"),
-                "longitude": article.get("longitude"),
-                "llm_summary": generate_summary(article.get("title", ""), article.get("description", ""))
-            })
+        results, next_cursor = await find_by_score(threshold, limit, cursor)
+        summaries = stored_summaries(results) if stream else await summarize_articles(results)
+
+        articles = [format_article(article, summary) for article, summary in zip(results, summaries)]
         logger.info(f"SCORE | Fetched {len(articles)} articles with relevance score >= {threshold}")
 
-        return {"articles": articles}
+        metadata = {"limit": limit, "next_cursor": next_cursor}
+        if include_total:
+            metadata.update(await count_total(score_filter(threshold)))
+
+        page = {"articles": articles, "metadata": metadata}
+        if stream:
+            return summary_stream_response(results, page, ArticlePage)
+        return page
 
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"SCORE | Error fetching articles by score: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching articles by score: {str(e)}")
\ No newline at end of file
@@ -1,9 +1,13 @@
 import logging
+from typing import Optional
 
 from fastapi import APIRouter, Query, HTTPException
 
-import app.context as context
-from app.services.llm import generate_summary
+from app.schemas import SearchPage
+from app.services.articles import format_article, search_text, text_filter
+from app.services.llm import stored_summaries, summarize_articles
+from app.services.pagination import InvalidCursor, count_total
+from app.services.sse import summary_stream_response
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("[search]")
@@ -11,72 +15,40 @@ logger = logging.getLogger("[search]")
 router = APIRouter()
 
 
-@router.get("/search")
-def search_articles(
+@router.get("/search", response_model=SearchPage)
+async def search_articles(
     query: str = Query(..., description="Search text in title and description"),
-    limit: int = Query(5, ge=1, le=20, description="Number of articles to return")
+    limit: int = Query(5, ge=1, le=20, description="Number of articles to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also count matching articles"),
+    stream: bool = Query(False, description="Stream summaries as Server-Sent Events")
 ):
     try:
-        logger.info(f"Type of limit: {type(limit)}, Value: {limit}")
-
-        # Filter: text search
-        text_query = {
-            "$text": {"$search": query}
-        }
-        projection = {
-            "score": {"$meta": "textScore"},
-            "title": 1,
-            "description": 1,
-            "url": 1,
-            "publication_date": 1,
-            "source_name": 1,
-            "category": 1,
-            "relevance_score": 1,
-            "latitude": 1,
-            "longitude": 1
-        }
-
         logger.info(f"SEARCH | Searching articles with query: {query}")
-        results = context.articles_collection.find(text_query, projection)
-
-        articles = []
-        for article in results:
-            relevance = article.get("relevance_score", 0)
-            text_score = article.get("score", 0)
-
-            # Combine both
-            final_score = 0.3 * relevance + 0.7 * text_score
-            article["final_score"] = final_score
-
-            articles.append(article)
-        logger.info(f"SEARCH | Found {len(articles)} articles matching query: {query}")
-
-        # Sort manually by combined score
-        sorted_articles = sorted(articles, key=lambda x: x["final_score"], reverse=True)[:limit]
+        results, next_cursor = await search_text(query, limit, cursor)
 
         # Format response
         response = []
-        for article in sorted_articles:
-            response.append({
-                "_id": str(article.get("_id")),
-                "title": article.get("title"),
-                "description": article.get("description"),
-                "url": article.get("url"),
-                "publication_date": article.get("publication_date"),
-                "source_name": article.get("source_name"),
-                "category": article.get("category"),
-                "relevance_score": round(article.get("relevance_score", 0), 2),
-                "latitude": article.get("latitude"),
-                "longitude": article.get("longitude"),
-                "llm_summary": generate_summary(article.get("title", ""), article.get("description", "")),
-                "metadata": {
-                    "text_score": round(article.get("score", 0), 2),
-                    "final_score": round(article.get("final_score", 0), 2)
-                }
+        summaries = stored_summaries(results) if stream else await summarize_articles(results)
+        for article, summary in zip(results, summaries):
+            formatted = format_article(article, summary, metadata={
+                "text_score": round(article.get("score", 0), 2),
+                "final_score": round(article.get("final_score", 0), 2)
             })
+            formatted["relevance_score"] = round(article.get("relevance_score", 0), 2)
+            response.append(formatted)
+
+        metadata = {"limit": limit, "next_cursor": next_cursor}
+        if include_total:
+            metadata.update(await count_total(*await text_filter(query)))
 
-        return {"articles": response}
+        page = {"articles": response, "metadata": metadata}
+        if stream:
+            return summary_stream_response(results, page, SearchPage)
+        return page
 
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"SEARCH | Error during search: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error during search: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,52 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Query, HTTPException
+
+import app.context as context
+from app.schemas import SemanticPage
+from app.services.articles import ARTICLE_PROJECTION, format_article
+from app.services.llm import stored_summaries, summarize_articles
+from app.services.pagination import InvalidCursor, decode_keyset, paginate
+from app.services.semantic import SEMANTIC_SORT, fetch_ranked, semantic_matches
+from app.services.sse import summary_stream_response
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[semantic]")
+
+router = APIRouter()
+
+
+@router.get("/semantic", response_model=SemanticPage)
+async def semantic_search(
+    query: str = Query(..., description="Free-text description of the articles to find"),
+    limit: int = Query(5, ge=1, le=20, description="Number of articles to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    stream: bool = Query(False, description="Stream summaries as Server-Sent Events")
+):
+    if context.semantic_index is None:
+        raise HTTPException(status_code=503, detail="Semantic search is disabled (no embedding index loaded)")
+
+    try:
+        logger.info(f"SEMANTIC | Searching articles similar to: {query}")
+        after = decode_keyset(cursor, len(SEMANTIC_SORT))
+        matches = await semantic_matches(query, limit + 1, after)
+        results, next_cursor = paginate(await fetch_ranked(matches, "similarity", ARTICLE_PROJECTION), SEMANTIC_SORT, limit)
+
+        response = []
+        summaries = stored_summaries(results) if stream else await summarize_articles(results)
+        for article, summary in zip(results, summaries):
+            response.append(format_article(article, summary, metadata={
+                "similarity": round(article["similarity"], 4)
+            }))
+
+        page = {"articles": response, "metadata": {"limit": limit, "next_cursor": next_cursor}}
+        if stream:
+            return summary_stream_response(results, page, SemanticPage)
+        return page
+
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"SEMANTIC | Error during semantic search: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error during semantic search: {str(e)}")
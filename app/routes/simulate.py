@@ -11,9 +11,9 @@ router = APIRouter()
 
 
 @router.post("/simulate")
-def simulate_events(count: int = Query(500, description="Number of events to simulate")):
+async def simulate_events(count: int = Query(500, description="Number of events to simulate")):
     try:
-        result = simulate_user_events(count)
+        result = await simulate_user_events(count)
         return result
 
     except Exception as e:
@@ -0,0 +1,24 @@
+import logging
+
+from fastapi import APIRouter
+
+import app.context as context
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[stats]")
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_stats():
+    return {
+        "llm": context.llm_gateway.stats() if context.llm_gateway else None,
+        "summaries": context.summary_metrics.stats() if context.summary_metrics else None,
+        "summary_cache": context.summary_cache.stats() if context.summary_cache else None,
+        "search": context.search_backend.stats() if context.search_backend else None,
+        "semantic": context.semantic_index.stats() if context.semantic_index else None,
+        "query_understanding": context.query_understanding.stats() if context.query_understanding else None,
+        "trending_engine": context.trending_engine.stats() if context.trending_engine else None,
+        "event_buffer": context.event_buffer.stats() if context.event_buffer else None
+    }
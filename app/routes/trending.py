@@ -1,13 +1,14 @@
 import logging
-from collections import defaultdict
-from datetime import datetime
 
 from fastapi import APIRouter, Query, HTTPException
 
 import app.context as context
-from app.services.llm import generate_summary
-from app.services.trending_cache import get_cached_trending, set_cached_trending
-from app.services.utils import haversine
+from app.schemas import TrendingArticles
+from app.services.aio import run_io
+from app.services.articles import ARTICLE_PROJECTION, format_article
+from app.services.llm import summarize_articles
+from app.services.trending import compute_trending_scores
+from app.services.trending_cache import get_or_compute_trending
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("[trending]")
@@ -15,65 +16,43 @@ logger = logging.getLogger("[trending]")
 router = APIRouter()
 
 
-@router.get("/trending")
-def get_trending_news(
+@router.get("/trending", response_model=TrendingArticles)
+async def get_trending_news(
     lat: float = Query(..., description="User's latitude"),
     lon: float = Query(..., description="User's longitude"),
     radius: float = Query(100, description="Radius in kilometers (default: 100km)"),
     limit: int = Query(5, ge=1, le=20, description="Number of trending articles to return")
 ):
     try:
-        cached = get_cached_trending(lat, lon)
-        if cached:
+        async def compute():
+            # Step 1: Score articles by nearby user events
+            trending_scores = await compute_trending_scores(lat, lon, radius, limit)
+
+            # Step 2: Fetch articles and rank them
+            article_ids = sorted(trending_scores, key=trending_scores.get, reverse=True)[:limit]
+            articles = await run_io(context.articles_collection.find({"id": {"$in": article_ids}}, {"id": 1, **ARTICLE_PROJECTION}).to_list)
+
+            # Step 3: Enrich and return
+            results = []
+            summaries = await summarize_articles(articles)
+            for article, summary in zip(articles, summaries):
+                results.append(format_article(article, summary, metadata={
+                    "trending_score": trending_scores[article["id"]]
+                }))
+
+            results.sort(key=lambda x: x["metadata"]["trending_score"], reverse=True)
+            return results
+
+        results, cache_hit = await get_or_compute_trending(lat, lon, radius, limit, compute)
+        if cache_hit:
             logger.info(f"TRENDING | Returning cached trending articles for {lat}, {lon}")
-            return {"articles": cached[:limit], "cache_hit": True}
 
-        now = datetime.utcnow()
-        trending_scores = defaultdict(lambda: 0)
+            # Fill in summaries that were still pending when this entry was cached
+            pending = [a for a in results if a.get("llm_summary") is None]
+            for article, summary in zip(pending, await summarize_articles(pending)):
+                article["llm_summary"] = summary
 
-        # Step 1: Get all user events within ~500km radius
-        events = list(context.user_events_collection.find())
-
-        for event in events:
-            ev_lat = event["location"]["lat"]
-            ev_lon = event["location"]["lon"]
-            distance = haversine(lat, lon, ev_lat, ev_lon)
-
-            if distance <= radius:
-                time_diff = (now - event["timestamp"]).total_seconds() / 3600  # in hours
-                decay = 1 / (time_diff + 1)
-                base = 2 if event["event_type"] == "click" else 1
-                proximity = 1 - (distance / radius)
-
-                trending_scores[event["article_id"]] += base * decay * proximity
-
-        # Step 2: Fetch articles and rank them
-        article_ids = sorted(trending_scores, key=trending_scores.get, reverse=True)[:limit]
-        articles = list(context.articles_collection.find({"id": {"$in": article_ids}}))
-
-        # Step 3: Enrich and return
-        results = []
-        for article in articles:
-            results.append({
-                "_id": str(article.get("_id")),
-                "title": article["title"],
-                "description": article["description"],
-                "url": article["url"],
-                "publication_date": article["publication_date"].isoformat(),
-                "source_name": article["source_name"],
-                "category": article["category"],
-                "relevance_score": article["relevance_score"],
-                "latitude": article["latitude"],
-                "longitude": article["longitude"],
-                "llm_summary": generate_summary(article.get("title", ""), article.get("description", "")),
-                "metadata": {
-                    "trending_score": trending_scores[article["id"]],
-                }
-            })
-
-        results.sort(key=lambda x: x["metadata"]["trending_score"], reverse=True)
-        set_cached_trending(lat, lon, results)
-        return {"trending_articles": results, "cache_hit": False}
+        return {"trending_articles": results, "cache_hit": cache_hit}
 
     except Exception as e:
         logger.error(f"TRENDING | Error generating trending articles: {str(e)}")
@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+# Response models shared by the article routes. Routes return plain dicts; FastAPI validates
+# and serializes them through these models in pydantic-core, then ORJSONResponse encodes them.
+
+
+class Article(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: str = Field(alias="_id")
+    title: Optional[str] = None
+    description: Optional[str] = None
+    url: Optional[str] = None
+    publication_date: Optional[datetime] = None
+    source_name: Optional[str] = None
+    category: Optional[list[str]] = None
+    relevance_score: Optional[float] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    llm_summary: Optional[str] = None
+
+
+class SearchScores(BaseModel):
+    text_score: float
+    final_score: float
+
+
+class SearchArticle(Article):
+    metadata: SearchScores
+
+
+class Distance(BaseModel):
+    distance_km: float
+
+
+class NearbyArticle(Article):
+    metadata: Distance
+
+
+class Similarity(BaseModel):
+    similarity: float
+
+
+class SemanticArticle(Article):
+    metadata: Similarity
+
+
+class TrendingScore(BaseModel):
+    trending_score: float
+
+
+class TrendingArticle(Article):
+    metadata: TrendingScore
+
+
+class PageMetadata(BaseModel):
+    limit: int
+    next_cursor: Optional[str] = None
+    total_results: Optional[int] = None
+    total_capped: Optional[bool] = None
+
+
+class QueryMetadata(PageMetadata):
+    query: str
+    understanding: str
+    partial: bool
+    failed_branches: list[str]
+    total_is_estimate: Optional[bool] = None
+
+
+class ArticlePage(BaseModel):
+    articles: list[Article]
+    metadata: PageMetadata
+
+
+class SearchPage(BaseModel):
+    articles: list[SearchArticle]
+    metadata: PageMetadata
+
+
+class SemanticPage(BaseModel):
+    articles: list[SemanticArticle]
+    metadata: PageMetadata
+
+
+class QueryPage(BaseModel):
+    articles: list[Article]
+    metadata: QueryMetadata
+
+
+class NearbyArticles(BaseModel):
+    articles: list[NearbyArticle]
+
+
+class TrendingArticles(BaseModel):
+    trending_articles: list[TrendingArticle]
+    cache_hit: bool
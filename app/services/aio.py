@@ -0,0 +1,17 @@
+import inspect
+
+from starlette.concurrency import run_in_threadpool
+
+import app.context as context
+
+
+async def run_io(fn, *args, **kwargs):
+    # Async mode: the clients in app.context are async, so just await the call.
+    # Sync mode: run the blocking PyMongo / redis-py / Groq call in the threadpool.
+    if context.async_mode:
+        result = fn(*args, **kwargs)
+        if inspect.isawaitable(result):
+            return await result
+        return result
+
+    return await run_in_threadpool(fn, *args, **kwargs)
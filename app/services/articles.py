@@ -0,0 +1,145 @@
+import logging
+import re
+
+import app.context as context
+from app.services.aio import run_io
+from app.services.pagination import PUBLICATION_SORT, RELEVANCE_SORT, decode_keyset, find_page, paginate
+from app.services.search_backend import SEARCH_SORT
+from app.services.utils import EARTH_RADIUS_KM, normalize_key, to_geo_point
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[articles]")
+
+# Fields the article routes render or need to summarize; _id is included by default
+ARTICLE_PROJECTION = {
+    "title": 1,
+    "description": 1,
+    "url": 1,
+    "publication_date": 1,
+    "source_name": 1,
+    "category": 1,
+    "relevance_score": 1,
+    "latitude": 1,
+    "longitude": 1,
+    "llm_summary": 1,
+    "summary_hash": 1
+}
+
+# Retrieval layer: functions return raw article documents (no summaries), so callers
+# such as /query can merge and paginate candidates before summarizing. Listing
+# functions return (articles, next_cursor) for one keyset page.
+
+
+def _key_filter(field: str, values: list, fuzzy: bool) -> dict:
+    # Exact matches on the normalized key are index lookups; fuzzy substring matches
+    # still scan the index keys, but never the documents themselves
+    keys = [normalize_key(v) for v in values]
+    if fuzzy:
+        return {field: {"$regex": "|".join(re.escape(k) for k in keys)}}
+    return {field: {"$in": keys}}
+
+
+def category_filter(categories: list, fuzzy: bool = False) -> dict:
+    return _key_filter("category_norm", categories, fuzzy)
+
+
+def source_filter(names: list, fuzzy: bool = False) -> dict:
+    return _key_filter("source_norm", names, fuzzy)
+
+
+def score_filter(threshold: float) -> dict:
+    return {"relevance_score": {"$gte": threshold}}
+
+
+async def text_filter(query: str) -> tuple:
+    # (filter, capped), see SearchBackend.match_filter
+    return await context.search_backend.match_filter(query)
+
+
+async def find_by_category(categories: list, limit: int, cursor: str | None = None, fuzzy: bool = False) -> tuple:
+    return await find_page(category_filter(categories, fuzzy), PUBLICATION_SORT, limit, cursor, ARTICLE_PROJECTION)
+
+
+async def find_by_source(names: list, limit: int, cursor: str | None = None, fuzzy: bool = False) -> tuple:
+    return await find_page(source_filter(names, fuzzy), PUBLICATION_SORT, limit, cursor, ARTICLE_PROJECTION)
+
+
+async def find_by_score(threshold: float, limit: int, cursor: str | None = None) -> tuple:
+    return await find_page(score_filter(threshold), RELEVANCE_SORT, limit, cursor, ARTICLE_PROJECTION)
+
+
+async def search_text(query: str, limit: int, cursor: str | None = None) -> tuple:
+    # Ranked by the search backend's blend of text score and relevance_score (final_score)
+    after = decode_keyset(cursor, len(SEARCH_SORT))
+    results = await context.search_backend.search(query, limit + 1, ARTICLE_PROJECTION, after)
+    return paginate(results, SEARCH_SORT, limit)
+
+
+async def _nearby_from_mongo(lat: float, lon: float, radius: float, limit: int) -> list:
+    # Distance filtering, sorting and limit all happen server-side on the 2dsphere index
+    pipeline = [
+        {
+            "$geoNear": {
+                "near": to_geo_point(lat, lon),
+                "key": "location",
+                "distanceField": "distance",
+                "maxDistance": radius * 1000,  # meters
+                "distanceMultiplier": 0.001,  # report distance in km
+                "spherical": True
+            }
+        },
+        {"$limit": limit},
+        {"$project": {"distance": 1, **ARTICLE_PROJECTION}}
+    ]
+    cursor = await run_io(context.articles_collection.aggregate, pipeline)
+    return await run_io(cursor.to_list)
+
+
+async def _nearby_from_geo_index(lat: float, lon: float, radius: float, limit: int) -> list:
+    index = context.article_geo_index
+    offsets, distances = index.nearest(lat, lon, limit, radius)
+    distance_by_id = dict(zip(index.keys(offsets).tolist(), distances.tolist()))
+    if not distance_by_id:
+        return []
+
+    query = {"_id": {"$in": list(distance_by_id)}}
+    articles = await run_io(context.articles_collection.find(query, ARTICLE_PROJECTION).to_list)
+    for article in articles:
+        article["distance"] = distance_by_id[article["_id"]]
+    return sorted(articles, key=lambda x: x["distance"])
+
+
+async def find_nearby(lat: float, lon: float, radius: float, limit: int) -> list:
+    # Nearest first, with the distance in km stored on each article
+    if context.nearby_backend == "memory" and context.article_geo_index is not None:
+        return await _nearby_from_geo_index(lat, lon, radius, limit)
+    return await _nearby_from_mongo(lat, lon, radius, limit)
+
+
+def nearby_filter(lat: float, lon: float, radius: float) -> dict:
+    # Articles within radius km, for queries that rank nearby articles by something other than distance
+    if context.nearby_backend == "memory" and context.article_geo_index is not None:
+        index = context.article_geo_index
+        offsets, _ = index.query_radius(lat, lon, radius)
+        return {"_id": {"$in": index.keys(offsets).tolist()}}
+    return {"location": {"$geoWithin": {"$centerSphere": [[lon, lat], radius / EARTH_RADIUS_KM]}}}
+
+
+def format_article(article: dict, summary: str | None, metadata: dict | None = None) -> dict:
+    # Presentation layer: the article shape shared by the listing routes
+    formatted = {
+        "_id": str(article.get("_id")),
+        "title": article.get("title"),
+        "description": article.get("description"),
+        "url": article.get("url"),
+        "publication_date": article.get("publication_date"),
+        "source_name": article.get("source_name"),
+        "category": article.get("category"),
+        "relevance_score": article.get("relevance_score"),
+        "latitude": article.get("latitude"),
+        "longitude": article.get("longitude"),
+        "llm_summary": summary
+    }
+    if metadata is not None:
+        formatted["metadata"] = metadata
+    return formatted
@@ -0,0 +1,211 @@
+import bisect
+import logging
+import math
+import threading
+
+import numpy as np
+
+from app.services.utils import tokenize
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[bm25]")
+
+FIELD_BOOSTS = {"title": 2.0, "description": 1.0}
+K1 = 1.2
+B = 0.75
+PREFIX_WEIGHT = 0.8  # "elect" -> "election", "electric", ...
+TYPO_WEIGHT = 0.6  # "elecion" -> "election"
+MIN_PREFIX_LENGTH = 3
+MIN_TYPO_LENGTH = 4
+MAX_EXPANSIONS = 20
+
+
+def _deletes(term: str) -> set:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+class BM25Index:
+    """In-memory inverted index over article title/description with BM25 field scoring.
+
+    Each field keeps its own postings (term -> doc offsets and term frequencies) and
+    length statistics; a document's score is the boosted sum of its per-field BM25
+    scores. Query terms missing from the vocabulary are expanded to vocabulary terms
+    they prefix, or failing that to terms one edit away, at a reduced weight.
+    Re-adding a key replaces the previous version of that document.
+    """
+
+    def __init__(self, field_boosts: dict = None):
+        self.field_boosts = field_boosts or FIELD_BOOSTS
+
+        self._keys = []
+        self._offsets = {}  # key -> live offset
+        self._live = np.zeros(0, dtype=bool)
+        self._relevance = np.zeros(0, dtype=np.float64)
+        self._lengths = {field: [] for field in self.field_boosts}
+        self._length_totals = dict.fromkeys(self.field_boosts, 0)
+        self._field_lengths = {field: np.zeros(0) for field in self.field_boosts}
+
+        self._terms = []  # offset -> terms of that document, to undo its doc_freq when it is replaced
+        self._postings = {field: {} for field in self.field_boosts}  # term -> list of (offset, tf)
+        self._posting_arrays = {}  # (field, term) -> cached (offsets, tfs) arrays
+        self._doc_freq = {}  # term -> number of documents containing it in any field
+
+        self._vocabulary = []  # sorted, for prefix lookups
+        self._vocabulary_dirty = False
+        self._deletes = {}  # delete-1 variant -> terms, for typo lookups
+
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def add_many(self, documents):
+        # documents: dicts with _id, relevance_score and the indexed fields
+        with self._lock:
+            documents = list(documents)
+            start = len(self._keys)
+            self._live = np.concatenate([self._live, np.ones(len(documents), dtype=bool)])
+            self._relevance = np.concatenate([
+                self._relevance,
+                np.array([doc.get("relevance_score") or 0.0 for doc in documents], dtype=np.float64)
+            ])
+
+            for offset, doc in enumerate(documents, start=start):
+                key = doc["_id"]
+                previous = self._offsets.get(key)
+                if previous is not None:
+                    self._remove(previous)
+                self._offsets[key] = offset
+                self._keys.append(key)
+
+                seen = set()
+                for field in self.field_boosts:
+                    tokens = tokenize(doc.get(field))
+                    self._lengths[field].append(len(tokens))
+                    self._length_totals[field] += len(tokens)
+
+                    counts = {}
+                    for token in tokens:
+                        counts[token] = counts.get(token, 0) + 1
+                    for term, tf in counts.items():
+                        self._postings[field].setdefault(term, []).append((offset, tf))
+                        self._posting_arrays.pop((field, term), None)
+                    seen.update(counts)
+
+                for term in seen:
+                    if term not in self._doc_freq:
+                        self._doc_freq[term] = 0
+                        self._vocabulary_dirty = True
+                        for variant in _deletes(term):
+                            self._deletes.setdefault(variant, set()).add(term)
+                    self._doc_freq[term] += 1
+                self._terms.append(seen)
+
+            self._field_lengths = {
+                field: np.array(lengths, dtype=np.float64) for field, lengths in self._lengths.items()
+            }
+
+    def _remove(self, offset: int):
+        # The document's postings stay behind, masked by _live; its statistics are taken back
+        self._live[offset] = False
+        for field in self.field_boosts:
+            self._length_totals[field] -= self._lengths[field][offset]
+            self._lengths[field][offset] = 0
+        for term in self._terms[offset]:
+            self._doc_freq[term] -= 1
+            if self._doc_freq[term] == 0:
+                # Only dead documents contain it: drop the term so it no longer blocks expansions
+                del self._doc_freq[term]
+                self._vocabulary_dirty = True
+                for variant in _deletes(term):
+                    terms = self._deletes[variant]
+                    terms.discard(term)
+                    if not terms:
+                        del self._deletes[variant]
+                for field in self.field_boosts:
+                    self._postings[field].pop(term, None)
+                    self._posting_arrays.pop((field, term), None)
+        self._terms[offset] = set()
+
+    def _vocabulary_terms(self) -> list:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._doc_freq)
+            self._vocabulary_dirty = False
+        return self._vocabulary
+
+    def _expand(self, token: str) -> list:
+        # (term, weight) pairs a query token matches
+        if token in self._doc_freq:
+            return [(token, 1.0)]
+
+        if len(token) >= MIN_PREFIX_LENGTH:
+            vocabulary = self._vocabulary_terms()
+            start = bisect.bisect_left(vocabulary, token)
+            matches = []
+            for term in vocabulary[start:]:
+                if not term.startswith(token):
+                    break
+                matches.append(term)
+            if matches:
+                matches.sort(key=lambda t: self._doc_freq[t], reverse=True)
+                return [(term, PREFIX_WEIGHT) for term in matches[:MAX_EXPANSIONS]]
+
+        if len(token) >= MIN_TYPO_LENGTH:
+            # Terms sharing a delete-1 variant with the token are within one edit
+            # (substitution, insertion, deletion or adjacent transposition)
+            candidates = set(self._deletes.get(token, ()))
+            for variant in _deletes(token):
+                if variant in self._doc_freq:
+                    candidates.add(variant)
+                candidates.update(self._deletes.get(variant, ()))
+            ranked = sorted(candidates, key=lambda t: self._doc_freq[t], reverse=True)
+            return [(term, TYPO_WEIGHT) for term in ranked[:MAX_EXPANSIONS]]
+
+        return []
+
+    def _posting_array(self, field: str, term: str) -> tuple:
+        arrays = self._posting_arrays.get((field, term))
+        if arrays is None:
+            postings = self._postings[field].get(term, ())
+            arrays = (
+                np.fromiter((p[0] for p in postings), dtype=np.int64, count=len(postings)),
+                np.fromiter((p[1] for p in postings), dtype=np.float64, count=len(postings))
+            )
+            self._posting_arrays[(field, term)] = arrays
+        return arrays
+
+    def scores(self, query: str) -> tuple:
+        """Returns (keys, bm25_scores, relevance_scores) of every live document matching query."""
+        with self._lock:
+            size = len(self._keys)
+            documents = len(self._offsets)
+            if documents == 0:
+                return [], np.zeros(0), np.zeros(0)
+
+            scores = np.zeros(size, dtype=np.float64)
+            for token in dict.fromkeys(tokenize(query)):
+                # An expanded token contributes its best-scoring expansion per document
+                token_scores = np.zeros(size, dtype=np.float64)
+                for term, weight in self._expand(token):
+                    doc_freq = self._doc_freq[term]
+                    idf = math.log(1 + (documents - doc_freq + 0.5) / (doc_freq + 0.5))
+                    term_scores = np.zeros(size, dtype=np.float64)
+                    for field, boost in self.field_boosts.items():
+                        offsets, tfs = self._posting_array(field, term)
+                        if len(offsets) == 0:
+                            continue
+                        average = self._length_totals[field] / documents or 1.0
+                        norm = K1 * (1 - B + B * self._field_lengths[field][offsets] / average)
+                        term_scores[offsets] += boost * idf * tfs * (K1 + 1) / (tfs + norm)
+                    np.maximum(token_scores, weight * term_scores, out=token_scores)
+                scores += token_scores
+
+            matched = np.flatnonzero((scores > 0) & self._live)
+            return [self._keys[i] for i in matched.tolist()], scores[matched], self._relevance[matched]
+
+
+def build_search_index(articles) -> BM25Index:
+    index = BM25Index()
+    index.add_many(articles)
+    logger.info(f"Indexed {len(index)} articles for full-text search")
+    return index
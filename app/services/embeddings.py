@@ -0,0 +1,70 @@
+import logging
+import zlib
+
+import numpy as np
+
+from app.services.utils import tokenize
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[embeddings]")
+
+HASHING_DIMENSIONS = 512
+
+
+def article_text(article: dict) -> str:
+    return f"{article.get('title') or ''}. {article.get('description') or ''}"
+
+
+class HashingEncoder:
+    """Dependency-free encoder: signed feature hashing of words, word bigrams and character
+    trigrams into a fixed-size, L2-normalized vector. Captures lexical and sub-word overlap
+    rather than meaning, but needs no model download and is stable across processes."""
+
+    def __init__(self, dimensions: int = HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def _features(self, text: str):
+        tokens = tokenize(text)
+        for token in tokens:
+            yield token, 1.0
+            padded = f"<{token}>"
+            for i in range(len(padded) - 2):
+                yield "#" + padded[i:i + 3], 0.3
+        for first, second in zip(tokens, tokens[1:]):
+            yield f"{first} {second}", 0.5
+
+    def encode(self, texts: list) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode())
+                vectors[row, h % self.dimensions] += weight if h & 0x80000000 else -weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+class SentenceTransformerEncoder:
+    """Local CPU embedding model via the optional sentence-transformers package."""
+
+    def __init__(self, model_name: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise RuntimeError(
+                "SEMANTIC_ENCODER=sentence-transformers requires `pip install sentence-transformers`"
+            )
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dimensions = self.model.get_sentence_embedding_dimension()
+        self.name = f"sentence-transformers/{model_name}"
+
+    def encode(self, texts: list) -> np.ndarray:
+        return self.model.encode(texts, batch_size=64, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def create_encoder(spec: str):
+    # "hashing", "hashing:<dimensions>" or "sentence-transformers:<model name>"
+    name, _, option = spec.partition(":")
+    if name == "sentence-transformers":
+        return SentenceTransformerEncoder(option or "all-MiniLM-L6-v2")
+    return HashingEncoder(int(option) if option else HASHING_DIMENSIONS)
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+
+from pymongo.errors import BulkWriteError
+
+import app.context as context
+from app.services.aio import run_io
+from app.services.trending import record_events
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[event_buffer]")
+
+
+class EventBufferFull(Exception):
+    pass
+
+
+class EventBuffer:
+    """In-process write buffer for user_events.
+
+    Events are flushed with insert_many(ordered=False) once max_batch_size events are
+    buffered or every flush_interval_seconds. When max_pending events are buffered or
+    in flight, producers wait up to enqueue_timeout_seconds for room before giving up.
+    """
+
+    def __init__(self, max_batch_size: int = 1000, flush_interval_seconds: float = 1.0,
+                 max_pending: int = 100000, enqueue_timeout_seconds: float = 2.0):
+        self.max_batch_size = max_batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+
+        self._events = []
+        self._pending = 0  # buffered + in-flight events
+        self._space = asyncio.Condition()
+        self._flush_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+        self._stopping = False
+
+        self.flushed = 0
+        self.dropped = 0
+        self.flushes = 0
+
+    async def add_many(self, events: list):
+        if len(events) > self.max_pending:
+            raise EventBufferFull(f"Batch of {len(events)} events exceeds buffer capacity {self.max_pending}")
+
+        async with self._space:
+            try:
+                await asyncio.wait_for(
+                    self._space.wait_for(lambda: self._pending + len(events) <= self.max_pending),
+                    timeout=self.enqueue_timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                raise EventBufferFull("Event buffer is full, retry later")
+
+            self._events.extend(events)
+            self._pending += len(events)
+
+        if len(self._events) >= self.max_batch_size:
+            self._flush_requested.set()
+
+    async def add(self, event: dict):
+        await self.add_many([event])
+
+    async def flush(self):
+        async with self._flush_lock:
+            while self._events:
+                batch = self._events[:self.max_batch_size]
+                del self._events[:self.max_batch_size]
+
+                try:
+                    await run_io(context.user_events_collection.insert_many, batch, ordered=False)
+                    record_events(batch)
+                    self.flushed += len(batch)
+                    self.flushes += 1
+                except BulkWriteError as e:
+                    # ordered=False: everything but the listed writes went in, so trending counts those
+                    failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                    record_events([event for i, event in enumerate(batch) if i not in failed])
+                    inserted = e.details.get("nInserted", 0)
+                    self.flushed += inserted
+                    self.dropped += len(batch) - inserted
+                    logger.error(f"Partially flushed events ({inserted}/{len(batch)}): {e.details.get('writeErrors', [])[:1]}")
+                except Exception as e:
+                    self.dropped += len(batch)
+                    logger.error(f"Failed to flush {len(batch)} events: {e}")
+                finally:
+                    async with self._space:
+                        self._pending -= len(batch)
+                        self._space.notify_all()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+            logger.info("Event buffer started")
+
+    async def stop(self):
+        if self._task is not None:
+            # Let an in-progress flush finish instead of cancelling it mid-write
+            self._stopping = True
+            self._flush_requested.set()
+            await self._task
+            self._task = None
+
+        await self.flush()
+        logger.info(f"Event buffer stopped after flushing {self.flushed} events")
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._events),
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "dropped": self.dropped
+        }
@@ -0,0 +1,204 @@
+import logging
+import math
+import threading
+from datetime import timezone
+
+import numpy as np
+
+from app.services.utils import haversine_np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[geo_index]")
+
+KM_PER_DEGREE = 111.195
+EVENT_WEIGHTS = {"click": 2, "view": 1}
+
+
+def cell_of(lat: float, lon: float, cell_degrees: float) -> tuple:
+    rows = math.ceil(180 / cell_degrees)
+    cols = math.ceil(360 / cell_degrees)
+    return min(int((lat + 90) // cell_degrees), rows - 1), int((lon + 180) // cell_degrees) % cols
+
+
+def cell_center(cell: tuple, cell_degrees: float) -> tuple:
+    row, col = cell
+    return (row + 0.5) * cell_degrees - 90, (col + 0.5) * cell_degrees - 180
+
+
+def cells_in_radius(lat: float, lon: float, radius_km: float, cell_degrees: float) -> list:
+    # Grid cells overlapping the bounding box of a radius_km circle around (lat, lon)
+    rows = math.ceil(180 / cell_degrees)
+    cols = math.ceil(360 / cell_degrees)
+
+    dlat = radius_km / KM_PER_DEGREE
+    row_min = max(int((lat - dlat + 90) // cell_degrees), 0)
+    row_max = min(int((lat + dlat + 90) // cell_degrees), rows - 1)
+
+    max_abs_lat = min(abs(lat) + dlat, 90.0)
+    if max_abs_lat >= 89.9:
+        col_range = range(cols)
+    else:
+        dlon = radius_km / (KM_PER_DEGREE * math.cos(math.radians(max_abs_lat)))
+        if 2 * dlon >= 360:
+            col_range = range(cols)
+        else:
+            col_min = int((lon - dlon + 180) // cell_degrees)
+            col_max = int((lon + dlon + 180) // cell_degrees)
+            col_range = sorted({c % cols for c in range(col_min, col_max + 1)})
+
+    return [(row, col) for row in range(row_min, row_max + 1) for col in col_range]
+
+
+class GeoIndex:
+    """In-memory grid index over (lat, lon) points with vectorized haversine distances.
+
+    Points are bucketed into fixed-size lat/lon cells; radius and k-nearest queries only
+    compute distances for points in the cells overlapping the query's bounding box.
+    Extra float columns (e.g. event weight/timestamp) can be stored alongside each point.
+    """
+
+    def __init__(self, cell_degrees: float = 1.0, columns: tuple = (), initial_capacity: int = 1024):
+        self.cell_degrees = cell_degrees
+        self._rows = math.ceil(180 / cell_degrees)
+        self._cols = math.ceil(360 / cell_degrees)
+
+        self._size = 0
+        self._lats = np.empty(initial_capacity, dtype=np.float64)
+        self._lons = np.empty(initial_capacity, dtype=np.float64)
+        self._keys = np.empty(initial_capacity, dtype=object)
+        self._columns = {name: np.empty(initial_capacity, dtype=np.float64) for name in columns}
+
+        self._cells = {}  # (row, col) -> list of point offsets
+        self._cell_arrays = {}  # (row, col) -> cached np.ndarray of the list above
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self, needed: int):
+        capacity = len(self._lats)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+
+        def resized(array):
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            return grown
+
+        self._lats = resized(self._lats)
+        self._lons = resized(self._lons)
+        self._keys = resized(self._keys)
+        self._columns = {name: resized(array) for name, array in self._columns.items()}
+
+    def add_many(self, lats, lons, keys, **columns):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        count = len(lats)
+        if count == 0:
+            return
+
+        with self._lock:
+            start = self._size
+            end = start + count
+            self._grow(end)
+
+            self._lats[start:end] = lats
+            self._lons[start:end] = lons
+            self._keys[start:end] = list(keys)
+            for name, array in self._columns.items():
+                array[start:end] = np.asarray(columns.get(name, 0.0), dtype=np.float64)
+
+            rows = np.minimum(((lats + 90) // self.cell_degrees).astype(np.int64), self._rows - 1)
+            cols = ((lons + 180) // self.cell_degrees).astype(np.int64) % self._cols
+            for offset, cell in enumerate(zip(rows.tolist(), cols.tolist()), start=start):
+                self._cells.setdefault(cell, []).append(offset)
+                self._cell_arrays.pop(cell, None)
+
+            self._size = end
+
+    def add(self, lat: float, lon: float, key, **columns):
+        self.add_many([lat], [lon], [key], **{name: [value] for name, value in columns.items()})
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        arrays = []
+        with self._lock:
+            for cell in cells_in_radius(lat, lon, radius_km, self.cell_degrees):
+                offsets = self._cells.get(cell)
+                if not offsets:
+                    continue
+                array = self._cell_arrays.get(cell)
+                if array is None:
+                    array = np.fromiter(offsets, dtype=np.int64, count=len(offsets))
+                    self._cell_arrays[cell] = array
+                arrays.append(array)
+
+        if not arrays:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(arrays)
+
+    def query_radius(self, lat: float, lon: float, radius_km: float) -> tuple:
+        # Returns (offsets, distances_km) of every point within radius_km, unsorted
+        offsets = self._candidates(lat, lon, radius_km)
+        if len(offsets) == 0:
+            return offsets, np.empty(0, dtype=np.float64)
+
+        distances = haversine_np(lat, lon, self._lats[offsets], self._lons[offsets])
+        mask = distances <= radius_km
+        return offsets[mask], distances[mask]
+
+    def nearest(self, lat: float, lon: float, k: int, radius_km: float) -> tuple:
+        # Returns (offsets, distances_km) of the k nearest points within radius_km, nearest first
+        offsets, distances = self.query_radius(lat, lon, radius_km)
+        if len(offsets) > k:
+            top = np.argpartition(distances, k - 1)[:k]
+            offsets, distances = offsets[top], distances[top]
+
+        order = np.argsort(distances, kind="stable")
+        return offsets[order], distances[order]
+
+    def keys(self, offsets: np.ndarray) -> np.ndarray:
+        return self._keys[offsets]
+
+    def column(self, name: str, offsets: np.ndarray) -> np.ndarray:
+        return self._columns[name][offsets]
+
+
+def get_event_weight(event_type: str) -> int:
+    return EVENT_WEIGHTS.get(event_type, 1)
+
+
+def build_article_index(articles, cell_degrees: float) -> GeoIndex:
+    index = GeoIndex(cell_degrees=cell_degrees)
+    add_articles(index, articles)
+    logger.info(f"Indexed {len(index)} article locations")
+    return index
+
+
+def build_event_index(events, cell_degrees: float) -> GeoIndex:
+    index = GeoIndex(cell_degrees=cell_degrees, columns=("weight", "timestamp"))
+    add_events(index, events)
+    logger.info(f"Indexed {len(index)} user event locations")
+    return index
+
+
+def add_articles(index: GeoIndex, articles):
+    articles = [a for a in articles if a.get("latitude") is not None and a.get("longitude") is not None]
+    index.add_many(
+        [a["latitude"] for a in articles],
+        [a["longitude"] for a in articles],
+        [a["_id"] for a in articles]
+    )
+
+
+def add_events(index: GeoIndex, events):
+    events = list(events)
+    index.add_many(
+        [e["location"]["lat"] for e in events],
+        [e["location"]["lon"] for e in events],
+        [e["article_id"] for e in events],
+        weight=[get_event_weight(e["event_type"]) for e in events],
+        timestamp=[e["timestamp"].replace(tzinfo=timezone.utc).timestamp() for e in events]
+    )
+
@@ -1,14 +1,25 @@
+import asyncio
 import logging
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
 
 import app.context as context
-from app.services.prompts import SUMMARISE, EXTRACT
+from app.services.prompts import SUMMARISE, SUMMARISE_BATCH, SUMMARISE_BATCH_ITEM, EXTRACT
+from app.services.llm_cache import get_content_hash, get_summary_key
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("[llm]")
 
+SUMMARY_MODEL = "llama-3.1-8b-instant"
+EXTRACTION_MODEL = "llama-3.1-8b-instant"
+FALLBACK_SUMMARY_CHARS = 200
+BATCH_TOKENS_PER_ARTICLE = 120  # a < 60 word summary plus its JSON wrapping
+
+# Summaries that outlive their request deadline keep running; hold references so they aren't collected
+_background_tasks = set()
+
 
 class ExtractionValues(BaseModel):
     category: Optional[List[str]] = []
@@ -21,44 +32,292 @@ class LLMExtractionResult(BaseModel):
     values: ExtractionValues = ExtractionValues()
 
 
-def generate_summary(title: str, description: str) -> str:
+class ArticleSummary(BaseModel):
+    id: int
+    summary: str
+
+
+class BatchSummaryResult(BaseModel):
+    summaries: List[ArticleSummary]
+
+
+def get_article_hash(title: str, description: str) -> str:
+    return get_content_hash(SUMMARISE, SUMMARY_MODEL, title, description)
+
+
+def fallback_summary(description: str) -> str:
+    # Served, never cached, when the LLM fails or its circuit is open
+    text = " ".join((description or "").split())
+    if len(text) <= FALLBACK_SUMMARY_CHARS:
+        return text
+    return text[:FALLBACK_SUMMARY_CHARS].rsplit(" ", 1)[0] + "..."
+
+
+def _record_call(kind: str, articles: int, response=None):
+    if context.summary_metrics is not None:
+        context.summary_metrics.record_call(kind, articles, getattr(response, "usage", None))
+
+
+async def request_summary(title: str, description: str) -> str:
+    prompt_template = SUMMARISE
+    prompt = prompt_template.format(title=title, description=description)
+
+    logger.info("Generating summary")
+    chat_response = await context.llm_gateway.complete(
+        model=SUMMARY_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.7,
+        max_tokens=256,
+        stop=None,
+        stream=False,
+        response_format={"type": "text"},
+    )
+    logger.info("Summary generated successfully")
+    _record_call("single", 1, chat_response)
+
+    return chat_response.choices[0].message.content.strip()
+
+
+async def request_summary_batch(items: list) -> list:
+    """Summarizes several (title, description) pairs with one JSON-mode prompt.
+
+    Returns a summary per pair, in order; None for any the response leaves out, leaves empty,
+    or that can't be read because the response doesn't match BatchSummaryResult.
+    """
+    articles = "\n".join(
+        SUMMARISE_BATCH_ITEM.format(id=i, title=title, description=description)
+        for i, (title, description) in enumerate(items, start=1)
+    )
+    prompt = SUMMARISE_BATCH.format(articles=articles)
+
+    logger.info(f"Generating {len(items)} summaries in one request")
+    chat_response = await context.llm_gateway.complete(
+        model=SUMMARY_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.7,
+        max_tokens=BATCH_TOKENS_PER_ARTICLE * len(items),
+        stop=None,
+        stream=False,
+        response_format={"type": "json_object"},
+    )
+
     try:
-        prompt_template = SUMMARISE
-        prompt = prompt_template.format(title=title, description=description)
-
-        logger.info("Generating summary")
-        chat_response = context.llm_client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=256,
-            stop=None,
-            stream=False,
-            response_format={"type": "text"},
-        )
-        logger.info("Summary generated successfully")
+        result = BatchSummaryResult.model_validate_json(chat_response.choices[0].message.content)
+    except ValidationError as e:
+        logger.warning(f"Discarding malformed batch summary response: {e}")
+        _record_call("batch", 0, chat_response)
+        return [None] * len(items)
+
+    by_id = {item.id: item.summary.strip() for item in result.summaries}
+    summaries = [by_id.get(i) or None for i in range(1, len(items) + 1)]
+    _record_call("batch", sum(summary is not None for summary in summaries), chat_response)
+    return summaries
+
+
+async def request_summary_stream(title: str, description: str):
+    # Yields the summary's text deltas as the LLM generates them
+    prompt = SUMMARISE.format(title=title, description=description)
+
+    logger.info("Streaming summary")
+    response = await context.llm_gateway.complete(
+        model=SUMMARY_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.7,
+        max_tokens=256,
+        stop=None,
+        stream=True,
+        response_format={"type": "text"},
+    )
+    _record_call("stream", 1)
+
+    if context.async_mode:
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    else:
+        # The blocking client's stream is a plain iterator; pull each chunk in the threadpool
+        chunks = iter(response)
+        while (chunk := await run_in_threadpool(next, chunks, None)) is not None:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+async def generate_summary(title: str, description: str, bypass_cache: bool = False) -> str:
+    cache = context.summary_cache
+    use_cache = cache is not None and not (bypass_cache or cache.bypass)
+    cache_key = get_summary_key(get_article_hash(title, description))
+
+    if use_cache:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        return chat_response.choices[0].message.content.strip()
+    try:
+        summary = await request_summary(title, description)
+        if use_cache and summary:
+            await cache.set(cache_key, summary)
+
+        return summary
 
     except Exception as e:
         logger.error(f"Error generating summary: {e}")
-        return ""
+        return fallback_summary(description)
+
+
+async def stream_summary(title: str, description: str, bypass_cache: bool = False):
+    # generate_summary, yielding the text as it is generated; a cached summary arrives as one delta
+    cache = context.summary_cache
+    use_cache = cache is not None and not (bypass_cache or cache.bypass)
+    cache_key = get_summary_key(get_article_hash(title, description))
+
+    if use_cache:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    try:
+        async for delta in request_summary_stream(title, description):
+            parts.append(delta)
+            yield delta
+    except Exception as e:
+        logger.error(f"Error streaming summary: {e}")
+        if not parts:
+            yield fallback_summary(description)
+        return
+
+    summary = "".join(parts).strip()
+    if use_cache and summary:
+        await cache.set(cache_key, summary)
+
+
+def get_stored_summary(article: dict) -> str | None:
+    # Prefer the summary stored by the offline pipeline while the content is unchanged
+    stored = article.get("llm_summary")
+    if stored and article.get("summary_hash") == get_article_hash(article.get("title", ""), article.get("description", "")):
+        return stored
+    return None
+
+
+def stored_summaries(articles: list) -> list:
+    # The summaries available without an LLM call; None for the rest
+    return [get_stored_summary(article) for article in articles]
+
+
+async def summarize_batch(articles: list) -> list:
+    """Summaries for articles without a stored summary: cached ones first, then the rest from one
+    batch prompt, and any the batch response misses with one generate_summary call each."""
+    pairs = [(article.get("title", ""), article.get("description", "")) for article in articles]
+    if len(pairs) == 1:
+        return [await generate_summary(*pairs[0])]
+
+    cache = context.summary_cache
+    use_cache = cache is not None and not cache.bypass
+    keys = [get_summary_key(get_article_hash(title, description)) for title, description in pairs]
+    summaries = list(await asyncio.gather(*(cache.get(key) for key in keys))) if use_cache else [None] * len(pairs)
+
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+    if len(missing) > 1:
+        try:
+            batch = await request_summary_batch([pairs[i] for i in missing])
+            for i, summary in zip(missing, batch):
+                summaries[i] = summary
+            if use_cache:
+                await asyncio.gather(*(cache.set(keys[i], summaries[i]) for i in missing if summaries[i]))
+        except Exception as e:
+            logger.error(f"Error generating batch summaries: {e}")
+
+        remaining = [i for i in missing if summaries[i] is None]
+        if remaining and context.summary_metrics is not None:
+            context.summary_metrics.record_fallbacks(len(remaining))
+        missing = remaining
+
+    for i, summary in zip(missing, await asyncio.gather(*(generate_summary(*pairs[i]) for i in missing))):
+        summaries[i] = summary
+    return summaries
+
+
+async def summarize_articles(articles: list, deadline_seconds: float | None = None) -> list:
+    # Summaries not ready by the deadline are returned as None and keep running in the
+    # background so they land in the cache for the next request.
+    if deadline_seconds is None:
+        deadline_seconds = context.summary_deadline_seconds
+
+    summaries = stored_summaries(articles)
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+    if not missing:
+        return summaries
+    if context.summary_metrics is not None:
+        context.summary_metrics.record_page()
+
+    # SUMMARY_BATCH_SIZE > 1 packs that many articles into each summarization prompt
+    batch_size = max(1, context.summary_batch_size or 1)
+    tasks = {
+        asyncio.ensure_future(summarize_batch([articles[i] for i in chunk])): chunk
+        for chunk in (missing[start:start + batch_size] for start in range(0, len(missing), batch_size))
+    }
+
+    done, pending = await asyncio.wait(tasks, timeout=deadline_seconds)
+    for task in done:
+        for i, summary in zip(tasks[task], task.result()):
+            summaries[i] = summary
+
+    if pending:
+        late = sum(len(tasks[task]) for task in pending)
+        logger.warning(f"{late}/{len(articles)} summaries not ready within {deadline_seconds}s")
+        for task in pending:
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+
+    return summaries
+
+
+async def stream_summaries(articles: list, summaries: list):
+    """Generates the missing (None) summaries concurrently, yielding ("summary_delta", index, text)
+    for each piece of text as it arrives and ("summary", index, summary) once an article's is complete."""
+    queue = asyncio.Queue()
+
+    async def produce(i: int):
+        parts = []
+        try:
+            async for delta in stream_summary(articles[i].get("title", ""), articles[i].get("description", "")):
+                parts.append(delta)
+                queue.put_nowait(("summary_delta", i, delta))
+        except Exception as e:
+            logger.error(f"Error streaming summary: {e}")
+        queue.put_nowait(("summary", i, "".join(parts).strip()))
+
+    tasks = [asyncio.ensure_future(produce(i)) for i, summary in enumerate(summaries) if summary is None]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            event = await queue.get()
+            if event[0] == "summary":
+                remaining -= 1
+            yield event
+    finally:
+        # A client that disconnects early leaves the rest to finish into the cache
+        for task in tasks:
+            if not task.done():
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
 
 
-def extract_entities_and_intent(query: str) -> dict:
+async def extract_entities_and_intent(query: str) -> dict:
     try:
         prompt_template = EXTRACT
         prompt = prompt_template.format(query=query)
 
         logger.info("Extracting entities and intent")
-        chat_completion = context.llm_client.chat.completions.create(
+        chat_completion = await context.llm_gateway.complete(
             messages=[
                 {
                     "role": "user",
                     "content": prompt,
                 }
             ],
-            model="llama-3.1-8b-instant",
+            model=EXTRACTION_MODEL,
             temperature=0.3,
             max_tokens=256,
             stop=None,
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import app.context as context
+from app.services.aio import run_io
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[llm_cache]")
+
+SUMMARY_KEY_PREFIX = "summary:"
+EXTRACTION_KEY_PREFIX = "extract:"
+
+
+def get_content_hash(template: str, model: str, title: str, description: str) -> str:
+    payload = json.dumps([template, model, title or "", description or ""], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_summary_key(content_hash: str) -> str:
+    return f"{SUMMARY_KEY_PREFIX}{content_hash}"
+
+
+def get_extraction_key(content_hash: str) -> str:
+    return f"{EXTRACTION_KEY_PREFIX}{content_hash}"
+
+
+class LLMCache:
+    """Bounded in-process LRU in front of Redis for LLM responses (summaries, query extractions)."""
+
+    def __init__(self, max_size: int = 10000, local_ttl_seconds: int = 3600,
+                 redis_ttl_seconds: int = 7 * 24 * 3600, bypass: bool = False):
+        self.max_size = max_size
+        self.local_ttl_seconds = local_ttl_seconds
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self.bypass = bypass
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> str | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.local_hits += 1
+                    return value
+                del self._entries[key]
+
+        try:
+            value = await run_io(context.redis_client.get, key)
+        except Exception as e:
+            logger.warning(f"Redis lookup failed for {key}: {e}")
+            value = None
+
+        if value is not None:
+            self._set_local(key, value)
+            with self._lock:
+                self.redis_hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        self._set_local(key, value)
+        try:
+            await run_io(context.redis_client.setex, key, self.redis_ttl_seconds, value)
+        except Exception as e:
+            logger.warning(f"Redis write failed for {key}: {e}")
+
+    def _set_local(self, key: str, value: str):
+        expires_at = time.monotonic() + self.local_ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.local_hits + self.redis_hits
+            lookups = hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "local_hits": self.local_hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "bypass": self.bypass,
+            }
@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+
+from groq import APIConnectionError, InternalServerError, RateLimitError
+
+from app.services.aio import run_io
+from app.services.llm_providers import ProviderError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[llm_gateway]")
+
+# Provider failures worth retrying and counted by the circuit breaker; other errors (bad
+# requests, authentication) are the caller's and are raised straight away
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+CHARS_PER_TOKEN = 4  # rough prompt size estimate for the token bucket
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, ProviderError):
+        return error.retryable
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+class LLMUnavailable(Exception):
+    """Raised without calling the provider: the circuit is open or the rate limit queue is too long."""
+
+
+class TokenBucket:
+    """Admits `rate` units per second with bursts of up to `capacity`.
+
+    acquire() reserves its units immediately (the balance may go negative) and then sleeps
+    until they are earned, so concurrent callers are admitted in order, evenly spaced.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0, max_wait: float | None = None):
+        async with self._lock:
+            self._refill()
+            amount = min(amount, self.capacity)
+            wait = max(0.0, (amount - self._tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                raise LLMUnavailable(f"Rate limit queue is {wait:.1f}s long")
+            self._tokens -= amount
+        if wait:
+            await asyncio.sleep(wait)
+
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive provider failures and fails calls fast for
+    `reset_seconds`; then lets one trial call through (half-open), closing again if it succeeds."""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def cancel_trial(self):
+        # The trial call was admitted but ended without an outcome (rejected or cancelled)
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_running or self.failures >= self.failure_threshold:
+            if self.state == "closed":
+                self.times_opened += 1
+            self.opened_at = time.monotonic()
+        self._trial_running = False
+
+
+def request_key(kwargs: dict) -> str:
+    return hashlib.sha256(json.dumps(kwargs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(kwargs: dict) -> int:
+    # Groq counts prompt and max_tokens against the tokens-per-minute quota
+    prompt_chars = sum(len(message.get("content") or "") for message in kwargs.get("messages", []))
+    return prompt_chars // CHARS_PER_TOKEN + kwargs.get("max_tokens", 0)
+
+
+class LLMGateway:
+    """Single entry point for chat completions.
+
+    Calls pass, in order: coalescing (identical in-flight requests share one call), the circuit
+    breaker, the request and token buckets (matched to the provider's per-minute quotas),
+    the concurrency limit, and jittered exponential retries on rate limits, connection errors
+    and 5xx responses, honouring retry-after. Per-minute limits of 0 disable that bucket.
+    """
+
+    def __init__(self, client, requests_per_minute: float = 30, tokens_per_minute: float = 6000,
+                 max_concurrency: int = 16, max_retries: int = 2, base_delay: float = 0.5,
+                 max_queue_seconds: float = 30, breaker: CircuitBreaker | None = None):
+        self.client = client
+        self.request_bucket = TokenBucket(requests_per_minute / 60, requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute else None
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_queue_seconds = max_queue_seconds
+        self.breaker = breaker or CircuitBreaker()
+
+        self._inflight = {}  # request key -> shared future
+
+        self.requests = 0
+        self.provider_calls = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+
+    async def complete(self, **kwargs):
+        """chat.completions.create(**kwargs) through the gateway. Streaming requests are not
+        coalesced; only opening the stream is retried."""
+        self.requests += 1
+        if kwargs.get("stream"):
+            return await self._call(kwargs)
+
+        key = request_key(kwargs)
+        shared = self._inflight.get(key)
+        if shared is not None:
+            self.coalesced += 1
+            return await asyncio.shield(shared)
+
+        shared = asyncio.ensure_future(self._call(kwargs))
+        self._inflight[key] = shared
+
+        def _finished(future):
+            self._inflight.pop(key, None)
+            if not future.cancelled():
+                future.exception()  # retrieved here too, in case every waiter has gone
+
+        shared.add_done_callback(_finished)
+        # Shielded: a waiter giving up (e.g. a summary deadline) doesn't cancel the shared call
+        return await asyncio.shield(shared)
+
+    async def _call(self, kwargs: dict):
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise LLMUnavailable("LLM provider circuit is open")
+
+        settled = False  # whether the breaker has been told how this call went
+        try:
+            try:
+                if self.request_bucket is not None:
+                    await self.request_bucket.acquire(1, self.max_queue_seconds)
+                if self.token_bucket is not None:
+                    await self.token_bucket.acquire(estimate_tokens(kwargs), self.max_queue_seconds)
+            except LLMUnavailable:
+                self.rejected += 1
+                raise
+
+            for attempt in range(self.max_retries + 1):
+                try:
+                    async with self.semaphore:
+                        self.provider_calls += 1
+                        response = await run_io(self.client.chat.completions.create, **kwargs)
+                    settled = True
+                    self.breaker.record_success()
+                    return response
+
+                except Exception as e:
+                    if not is_retryable(e):
+                        # The provider answered; the request itself was rejected
+                        settled = True
+                        self.breaker.record_success()
+                        raise
+                    if attempt == self.max_retries:
+                        self.failures += 1
+                        settled = True
+                        self.breaker.record_failure()
+                        raise
+                    self.retries += 1
+                    await asyncio.sleep(self._retry_delay(e, attempt))
+
+        except BaseException:
+            # Rejected by a bucket or cancelled (client gone, summary deadline) before an
+            # outcome: free the half-open trial slot so the next call can be the trial
+            if not settled:
+                self.breaker.cancel_trial()
+            raise
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            delay = float(retry_after) if retry_after else self.base_delay * (2 ** attempt)
+        except ValueError:
+            delay = self.base_delay * (2 ** attempt)
+        delay += random.uniform(0, self.base_delay)
+        logger.warning(f"LLM call failed ({type(error).__name__}), retrying in {delay:.1f}s")
+        return delay
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "provider_calls": self.provider_calls,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "in_flight": len(self._inflight),
+            "max_concurrency": self.max_concurrency,
+            "circuit": self.breaker.state,
+            "circuit_opened": self.breaker.times_opened,
+            "requests_available": round(self.request_bucket.available(), 2) if self.request_bucket else None,
+            "tokens_available": round(self.token_bucket.available()) if self.token_bucket else None,
+        }
@@ -0,0 +1,294 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+import types
+
+import httpx
+from groq import AsyncGroq, Groq
+
+from app.services.utils import tokenize
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[llm_providers]")
+
+# Every provider exposes the OpenAI-style client.chat.completions.create(**kwargs) that Groq's SDK
+# has: responses with choices[0].message.content and usage, or, with stream=True, an iterator of
+# chunks with choices[0].delta.content (async in ASYNC_MODE, blocking otherwise).
+
+CHARS_PER_TOKEN = 4
+
+
+class ProviderError(Exception):
+    """Error from a non-Groq provider. Rate limits, 5xx responses and connection failures
+    (no status code) are retryable, like their Groq SDK counterparts."""
+
+    def __init__(self, message: str, status_code: int | None = None, response: httpx.Response | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = response
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+def _namespace(value):
+    # JSON response -> attribute access, matching the SDK's response objects
+    if isinstance(value, dict):
+        return types.SimpleNamespace(**{key: _namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_namespace(item) for item in value]
+    return value
+
+
+def _chat_interface(create):
+    return types.SimpleNamespace(completions=types.SimpleNamespace(create=create))
+
+
+class OpenAICompatibleClient:
+    """Chat completions from an OpenAI-compatible HTTP endpoint, such as a local vLLM,
+    llama.cpp or Ollama server (LLM_BASE_URL, e.g. http://localhost:11434/v1).
+
+    `model`, when set, replaces the model named in requests, since local servers name
+    their models differently.
+    """
+
+    def __init__(self, base_url: str, api_key: str | None = None, model: str | None = None,
+                 async_mode: bool = True, timeout: float = 60):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        client_class = httpx.AsyncClient if async_mode else httpx.Client
+        self._http = client_class(headers=headers, timeout=timeout)
+        self.chat = _chat_interface(self._create_async if async_mode else self._create_sync)
+
+    def _payload(self, kwargs: dict) -> dict:
+        payload = {key: value for key, value in kwargs.items() if value is not None}
+        if self.model:
+            payload["model"] = self.model
+        return payload
+
+    @staticmethod
+    def _check(response: httpx.Response):
+        if response.status_code >= 400:
+            raise ProviderError(
+                f"{response.status_code} from LLM endpoint: {response.text[:200]}", response.status_code, response
+            )
+
+    async def _create_async(self, **kwargs):
+        payload = self._payload(kwargs)
+        try:
+            request = self._http.build_request("POST", self.url, json=payload)
+            response = await self._http.send(request, stream=bool(payload.get("stream")))
+        except httpx.HTTPError as e:
+            raise ProviderError(f"LLM endpoint unreachable: {e}")
+
+        if not payload.get("stream"):
+            self._check(response)
+            return _namespace(response.json())
+        if response.status_code >= 400:
+            await response.aread()
+            await response.aclose()
+            self._check(response)
+        return self._aiter_chunks(response)
+
+    def _create_sync(self, **kwargs):
+        payload = self._payload(kwargs)
+        try:
+            request = self._http.build_request("POST", self.url, json=payload)
+            response = self._http.send(request, stream=bool(payload.get("stream")))
+        except httpx.HTTPError as e:
+            raise ProviderError(f"LLM endpoint unreachable: {e}")
+
+        if not payload.get("stream"):
+            self._check(response)
+            return _namespace(response.json())
+        if response.status_code >= 400:
+            response.read()
+            response.close()
+            self._check(response)
+        return self._iter_chunks(response)
+
+    @staticmethod
+    def _chunk(line: str):
+        # Server-sent events: "data: {json}" per chunk, "data: [DONE]" at the end
+        if not line.startswith("data:"):
+            return None
+        data = line[5:].strip()
+        return None if data == "[DONE]" else _namespace(json.loads(data))
+
+    async def _aiter_chunks(self, response: httpx.Response):
+        try:
+            async for line in response.aiter_lines():
+                chunk = self._chunk(line)
+                if chunk is not None:
+                    yield chunk
+        finally:
+            await response.aclose()
+
+    def _iter_chunks(self, response: httpx.Response):
+        try:
+            for line in response.iter_lines():
+                chunk = self._chunk(line)
+                if chunk is not None:
+                    yield chunk
+        finally:
+            response.close()
+
+
+def parse_latency(spec: str):
+    """Returns a sampler of seconds for "fixed:<ms>", "uniform:<min ms>:<max ms>" or
+    "lognormal:<median ms>:<sigma>" (a long right tail, like real LLM latencies)."""
+    kind, *values = spec.split(":")
+    values = [float(v) for v in values]
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda rng: rng.lognormvariate(0, sigma) * median / 1000
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+_FIELD = re.compile(r"^(Title|Description): ?(.*)$", re.MULTILINE)
+_BATCH_ITEM = re.compile(r"^\[(\d+)\]\nTitle: ?(.*)\nDescription: ?(.*)$", re.MULTILINE)
+_USER_QUERY = re.compile(r'User Query: "(.*)"', re.DOTALL)
+_NEARBY_WORDS = {"near", "nearby", "around", "local"}
+
+
+def fake_summary(title: str, description: str, words: int = 40) -> str:
+    text = " ".join(f"{title}. {description}".split()[:words])
+    return f"{text} (fake summary)"
+
+
+def fake_extraction(query: str) -> dict:
+    tokens = tokenize(query)
+    intent = ["search"] + (["nearby"] if _NEARBY_WORDS & set(tokens) else [])
+    return {
+        "intent": intent,
+        "entities": [token for token in tokens if token not in _NEARBY_WORDS],
+        "values": {"category": [], "source": []}
+    }
+
+
+class FakeLLMClient:
+    """Deterministic stand-in for load tests: no network and no quota.
+
+    Output depends only on the prompt: summaries are the article's opening words, batch
+    prompts get one per article, and extraction prompts get a "search" intent over the
+    query's words (plus "nearby" for words like "near"). Latency (time to first token, plus
+    `token_ms` per further word) and failures (`error_rate`, as retryable 503s) are drawn
+    from a seeded generator.
+    """
+
+    def __init__(self, latency: str = "lognormal:400:0.5", error_rate: float = 0.0, token_ms: float = 5,
+                 seed: int = 0, async_mode: bool = True):
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.token_seconds = token_ms / 1000
+        self.rng = random.Random(seed)
+        self.chat = _chat_interface(self._create_async if async_mode else self._create_sync)
+
+    def _respond(self, kwargs: dict) -> str:
+        prompt = kwargs["messages"][-1]["content"]
+        if (kwargs.get("response_format") or {}).get("type") == "json_object":
+            items = _BATCH_ITEM.findall(prompt)
+            if items:
+                return json.dumps({"summaries": [
+                    {"id": int(i), "summary": fake_summary(title, description)} for i, title, description in items
+                ]})
+            query = _USER_QUERY.search(prompt)
+            return json.dumps(fake_extraction(query.group(1) if query else prompt))
+
+        fields = dict(_FIELD.findall(prompt))
+        if fields:
+            return fake_summary(fields.get("Title", ""), fields.get("Description", ""))
+        return "fake response " + hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+    def _plan(self, kwargs: dict) -> tuple:
+        # (delay before the first token, output) or raises the simulated failure
+        if self.rng.random() < self.error_rate:
+            raise ProviderError("Simulated provider failure", 503)
+        return self.sample_latency(self.rng), self._respond(kwargs)
+
+    @staticmethod
+    def _response(kwargs: dict, content: str):
+        prompt_tokens = sum(len(m.get("content") or "") for m in kwargs["messages"]) // CHARS_PER_TOKEN
+        completion_tokens = len(content) // CHARS_PER_TOKEN
+        return _namespace({
+            "model": kwargs.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+    @staticmethod
+    def _pieces(content: str) -> list:
+        return re.findall(r"\S+\s*", content) or [content]
+
+    @staticmethod
+    def _chunk(text: str):
+        return _namespace({"choices": [{"index": 0, "delta": {"content": text}}]})
+
+    async def _create_async(self, **kwargs):
+        first_token, content = self._plan(kwargs)
+        pieces = self._pieces(content)
+        if kwargs.get("stream"):
+            return self._aiter_chunks(first_token, pieces)
+        await asyncio.sleep(first_token + self.token_seconds * (len(pieces) - 1))
+        return self._response(kwargs, content)
+
+    def _create_sync(self, **kwargs):
+        first_token, content = self._plan(kwargs)
+        pieces = self._pieces(content)
+        if kwargs.get("stream"):
+            return self._iter_chunks(first_token, pieces)
+        time.sleep(first_token + self.token_seconds * (len(pieces) - 1))
+        return self._response(kwargs, content)
+
+    async def _aiter_chunks(self, first_token: float, pieces: list):
+        await asyncio.sleep(first_token)
+        for i, piece in enumerate(pieces):
+            if i:
+                await asyncio.sleep(self.token_seconds)
+            yield self._chunk(piece)
+
+    def _iter_chunks(self, first_token: float, pieces: list):
+        time.sleep(first_token)
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(self.token_seconds)
+            yield self._chunk(piece)
+
+
+def create_llm_client(provider: str, async_mode: bool, settings: dict):
+    """provider: groq | openai (OpenAI-compatible endpoint) | fake; settings come from the LLM_* env."""
+    if provider == "openai":
+        return OpenAICompatibleClient(
+            base_url=settings.get("base_url") or "http://localhost:11434/v1",
+            api_key=settings.get("api_key"),
+            model=settings.get("model"),
+            async_mode=async_mode,
+            timeout=float(settings.get("timeout_seconds") or 60)
+        )
+    if provider == "fake":
+        return FakeLLMClient(
+            latency=settings.get("fake_latency") or "lognormal:400:0.5",
+            error_rate=float(settings.get("fake_error_rate") or 0),
+            token_ms=float(settings.get("fake_token_ms") or 5),
+            seed=int(settings.get("fake_seed") or 0),
+            async_mode=async_mode
+        )
+    if provider == "groq":
+        # Retries are the gateway's, so the SDK's own are disabled
+        client_class = AsyncGroq if async_mode else Groq
+        return client_class(api_key=settings.get("groq_api_key"), max_retries=0)
+    raise ValueError(f"Unknown LLM_PROVIDER: {provider}")
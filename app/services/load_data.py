@@ -0,0 +1,159 @@
+import json
+import logging
+import time
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+
+from app.services.utils import normalize_key, to_geo_point
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[load_data]")
+
+READ_CHUNK_SIZE = 1 << 16  # characters read from the data file at a time
+LOAD_BATCH_SIZE = 1000
+
+# Upserts look articles up by id, so its index is built before loading
+ARTICLE_ID_INDEX = IndexModel([("id", ASCENDING)], name="ArticleIdIndex", unique=True)
+
+# Built once after a load, rather than maintained document by document while loading
+ARTICLE_INDEXES = [
+    IndexModel([("title", "text"), ("description", "text")], name="TextIndex"),
+    IndexModel([("location", "2dsphere")], name="LocationIndex"),
+    # Keyset pagination sorts on (publication_date, _id) and (relevance_score, _id);
+    # /category and /source filter on the normalized key first
+    IndexModel([("publication_date", DESCENDING), ("_id", DESCENDING)], name="PublicationDateIndex"),
+    IndexModel([("relevance_score", DESCENDING), ("_id", DESCENDING)], name="RelevanceScoreIndex"),
+    IndexModel(
+        [("category_norm", ASCENDING), ("publication_date", DESCENDING), ("_id", DESCENDING)],
+        name="CategoryDateIndex"
+    ),
+    IndexModel(
+        [("source_norm", ASCENDING), ("publication_date", DESCENDING), ("_id", DESCENDING)],
+        name="SourceDateIndex"
+    ),
+]
+
+
+def iter_json_records(path: str):
+    """Yields the objects of a JSON array or an NDJSON file, reading it incrementally."""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            # Top-level separators: whitespace, and the brackets and commas of an array
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] in "[,]"):
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    return
+                buffer, pos = f.read(READ_CHUNK_SIZE), 0
+                eof = not buffer
+                continue
+
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The record continues past the buffer
+                chunk = f.read(READ_CHUNK_SIZE)
+                buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+                continue
+
+            yield record
+            pos = end
+
+
+def prepare_article(article: dict) -> dict:
+    # Fields derived at load time: typed dates, a GeoJSON point and the normalized lookup keys
+    if isinstance(article.get("publication_date"), str):
+        article["publication_date"] = datetime.fromisoformat(article["publication_date"])
+    if article.get("latitude") is not None and article.get("longitude") is not None:
+        article["location"] = to_geo_point(article["latitude"], article["longitude"])
+    article["category_norm"] = [normalize_key(c) for c in article.get("category") or []]
+    article["source_norm"] = normalize_key(article.get("source_name") or "")
+    return article
+
+
+def _write_batch(articles_collection, batch: dict, totals: dict):
+    # Upserts keyed on the article id: re-running a load updates articles instead of duplicating them
+    result = articles_collection.bulk_write(
+        [UpdateOne({"id": article_id}, {"$set": article}, upsert=True) for article_id, article in batch.items()],
+        ordered=False
+    )
+    totals["inserted"] += result.upserted_count
+    totals["updated"] += result.modified_count
+    totals["unchanged"] += result.matched_count - result.modified_count
+
+
+def load_articles(articles_collection, path: str, batch_size: int = LOAD_BATCH_SIZE) -> dict:
+    """Streams articles from path into MongoDB in bounded upsert batches, then builds the indexes."""
+    articles_collection.create_indexes([ARTICLE_ID_INDEX])
+
+    totals = {"read": 0, "inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    started = time.perf_counter()
+    batch = {}  # id -> article; a repeated id keeps its last version
+    for article in iter_json_records(path):
+        totals["read"] += 1
+        if not isinstance(article, dict) or not article.get("id"):
+            totals["skipped"] += 1
+            continue
+        batch[article["id"]] = prepare_article(article)
+        if len(batch) >= batch_size:
+            _write_batch(articles_collection, batch, totals)
+            batch = {}
+            elapsed = time.perf_counter() - started
+            logger.info(f"Loaded {totals['read']} articles ({totals['read'] / elapsed:.0f} articles/s)")
+    if batch:
+        _write_batch(articles_collection, batch, totals)
+
+    elapsed = time.perf_counter() - started
+    totals["seconds"] = round(elapsed, 3)
+    totals["articles_per_second"] = round(totals["read"] / elapsed) if elapsed else None
+    logger.info(
+        f"Read {totals['read']} articles from {path} in {elapsed:.2f}s ({totals['articles_per_second']} articles/s): "
+        f"{totals['inserted']} inserted, {totals['updated']} updated, {totals['unchanged']} unchanged, "
+        f"{totals['skipped']} skipped without an id"
+    )
+
+    backfill_articles(articles_collection)
+    ensure_article_indexes(articles_collection)
+    return totals
+
+
+def backfill_articles(articles_collection):
+    # Derived fields for articles loaded before they were computed at load time
+    result = articles_collection.update_many(
+        {
+            "location": {"$exists": False},
+            "latitude": {"$type": "number"},
+            "longitude": {"$type": "number"}
+        },
+        [{"$set": {"location": {"type": "Point", "coordinates": ["$longitude", "$latitude"]}}}]
+    )
+    if result.modified_count:
+        logger.info(f"Added GeoJSON location to {result.modified_count} articles.")
+
+    result = articles_collection.update_many(
+        {"$or": [{"category_norm": {"$exists": False}}, {"source_norm": {"$exists": False}}]},
+        [{"$set": {
+            "category_norm": {
+                "$map": {"input": {"$ifNull": ["$category", []]}, "in": {"$toLower": {"$trim": {"input": "$$this"}}}}
+            },
+            "source_norm": {"$toLower": {"$trim": {"input": {"$ifNull": ["$source_name", ""]}}}}
+        }}]
+    )
+    if result.modified_count:
+        logger.info(f"Added category_norm/source_norm to {result.modified_count} articles.")
+
+
+def ensure_article_indexes(articles_collection):
+    started = time.perf_counter()
+    articles_collection.create_indexes([ARTICLE_ID_INDEX, *ARTICLE_INDEXES])
+    logger.info(f"Article indexes are ready ({time.perf_counter() - started:.2f}s).")
+
+
+def missing_article_indexes(articles_collection) -> list:
+    existing = articles_collection.index_information()
+    return [index.document["name"] for index in (ARTICLE_ID_INDEX, *ARTICLE_INDEXES) if index.document["name"] not in existing]
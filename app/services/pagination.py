@@ -0,0 +1,94 @@
+import base64
+import binascii
+
+from bson import json_util
+
+import app.context as context
+from app.services.aio import run_io
+
+TOTAL_COUNT_CAP = 10000  # include_total counts stop here instead of scanning every match
+
+PUBLICATION_SORT = [("publication_date", -1), ("_id", -1)]
+RELEVANCE_SORT = [("relevance_score", -1), ("_id", -1)]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(state: dict) -> str:
+    # Opaque, URL-safe token; json_util keeps ObjectId and datetime sort keys intact
+    payload = json_util.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json_util.loads(payload)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+    if not isinstance(state, dict):
+        raise InvalidCursor("Invalid cursor")
+    return state
+
+
+def check_keyset(after, width: int) -> list:
+    # Every sort ends with _id, so a keyset position has one value per sort field
+    if not isinstance(after, list) or len(after) != width:
+        raise InvalidCursor("Cursor does not match this sort order")
+    return after
+
+
+def decode_keyset(cursor: str | None, width: int) -> list | None:
+    """The keyset position stored by paginate() in cursor, or None without a cursor."""
+    if not cursor:
+        return None
+    return check_keyset(decode_cursor(cursor).get("after"), width)
+
+
+def sort_values(doc: dict, sort: list) -> list:
+    return [doc.get(field) for field, _ in sort]
+
+
+def keyset_filter(sort: list, after: list) -> dict:
+    # Documents strictly after `after` in `sort` order, e.g. for (a desc, b desc):
+    # a < a0 OR (a == a0 AND b < b0)
+    if len(after) != len(sort):
+        raise InvalidCursor("Cursor does not match this sort order")
+
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {f: value for (f, _), value in zip(sort[:i], after[:i])}
+        clause[field] = {"$lt" if direction < 0 else "$gt": after[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+async def find_sorted(query: dict, sort: list, limit: int, after: list | None = None,
+                      projection: dict | None = None) -> list:
+    if after is not None:
+        query = {"$and": [query, keyset_filter(sort, after)]}
+    return await run_io(context.articles_collection.find(query, projection).sort(sort).limit(limit).to_list)
+
+
+async def find_page(query: dict, sort: list, limit: int, cursor: str | None = None,
+                    projection: dict | None = None) -> tuple:
+    """Returns (articles, next_cursor) for one keyset page of `query` in `sort` order."""
+    after = decode_keyset(cursor, len(sort))
+    # One extra document tells whether another page exists
+    docs = await find_sorted(query, sort, limit + 1, after, projection)
+    return paginate(docs, sort, limit)
+
+
+def paginate(docs: list, sort: list, limit: int) -> tuple:
+    # docs holds up to limit + 1 sorted results
+    page = docs[:limit]
+    next_cursor = encode_cursor({"after": sort_values(page[-1], sort)}) if len(docs) > limit else None
+    return page, next_cursor
+
+
+async def count_total(query: dict, capped: bool = False) -> dict:
+    # capped: query already selects only part of the matches (e.g. a capped search filter)
+    total = await run_io(context.articles_collection.count_documents, query, limit=TOTAL_COUNT_CAP)
+    return {"total_results": total, "total_capped": capped or total >= TOTAL_COUNT_CAP}
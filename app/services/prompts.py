@@ -10,6 +10,27 @@ Description: {description}
 Summary:
 """
 
+SUMMARISE_BATCH = """
+You are a professional news summarizer.
+
+For each numbered article below, read its **title** and **description** and generate a clear, factual summary in **less than 60 words**. Each summary must capture the core news context of its own article using both title and description — no opinions, no repetition, no details from other articles.
+
+Return a valid JSON object with one entry per article, using the article's number as its id:
+{{
+  "summaries": [
+    {{"id": 1, "summary": "..."}},
+    ...
+  ]
+}}
+
+{articles}
+"""
+
+SUMMARISE_BATCH_ITEM = """[{id}]
+Title: {title}
+Description: {description}
+"""
+
 EXTRACT = """
 You are an intelligent query analysis system. Given a user's natural language query, extract and return the following information as a valid JSON object.
 
@@ -0,0 +1,141 @@
+import json
+import logging
+import re
+import threading
+import unicodedata
+
+from app.services.llm import EXTRACTION_MODEL, extract_entities_and_intent
+from app.services.llm_cache import LLMCache, get_content_hash, get_extraction_key
+from app.services.prompts import EXTRACT
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[query_understanding]")
+
+# Words that carry no intent of their own in queries like "latest sports news from Reuters"
+FILLER_WORDS = {
+    "a", "about", "all", "an", "and", "any", "article", "articles", "at", "breaking", "by", "current",
+    "find", "for", "from", "get", "give", "headline", "headlines", "in", "latest", "list", "me", "new",
+    "news", "of", "on", "please", "recent", "related", "show", "stories", "story", "the", "to", "today",
+    "top", "update", "updates", "what", "whats", "with",
+}
+NEARBY_PHRASES = ("near me", "nearby", "near by", "around me", "close to me", "near here", "around here", "local")
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_query(query: str) -> str:
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+class QueryVocabulary:
+    """Phrases that resolve a query without the LLM: corpus categories, source names and "near me"."""
+
+    def __init__(self, categories: list, sources: list):
+        self._phrases = {}  # tuple of tokens -> (kind, value)
+        for phrase in NEARBY_PHRASES:
+            self._add(phrase, "nearby", None)
+        for source in sources:
+            self._add(normalize_query(source), "source", source)
+        for category in categories:
+            phrase = normalize_query(category)
+            self._add(phrase, "category", category)
+            # Accept "sport" for "sports" and "startups" for "startup"
+            self._add(phrase[:-1] if phrase.endswith("s") else f"{phrase}s", "category", category)
+
+        self.max_phrase_length = max((len(tokens) for tokens in self._phrases), default=1)
+
+    def _add(self, phrase: str, kind: str, value):
+        tokens = tuple(phrase.split())
+        if tokens and (tokens not in self._phrases or kind == "category"):
+            self._phrases[tokens] = (kind, value)
+
+    def resolve(self, normalized_query: str) -> dict | None:
+        # Returns an extraction result only when every non-filler word is a known phrase
+        tokens = normalized_query.split()
+        matches = []
+        i = 0
+        while i < len(tokens):
+            for length in range(min(self.max_phrase_length, len(tokens) - i), 0, -1):
+                phrase = tuple(tokens[i:i + length])
+                if phrase in self._phrases:
+                    matches.append((phrase, *self._phrases[phrase]))
+                    i += length
+                    break
+            else:
+                if tokens[i] not in FILLER_WORDS:
+                    return None
+                i += 1
+
+        if not matches:
+            return None
+
+        values = {"category": [], "source": []}
+        intents = []
+        for _, kind, value in matches:
+            if kind not in intents:
+                intents.append(kind)
+            if value is not None and value not in values[kind]:
+                values[kind].append(value)
+
+        return {
+            "entities": [" ".join(phrase) for phrase, _, _ in matches],
+            "intent": intents,
+            "values": values
+        }
+
+
+class QueryUnderstanding:
+    """Resolves a query through the rule-based fast path, then the extraction cache, then the LLM."""
+
+    def __init__(self, vocabulary: QueryVocabulary, cache: LLMCache, fast_path_enabled: bool = True):
+        self.vocabulary = vocabulary
+        self.cache = cache
+        self.fast_path_enabled = fast_path_enabled
+
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.fast_path = 0
+        self.cache_hits = 0
+        self.llm_calls = 0
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.queries += 1
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    async def understand(self, query: str) -> tuple:
+        """Returns (extraction result, resolved_by) where resolved_by is fast_path, cache or llm."""
+        normalized = normalize_query(query)
+
+        if self.fast_path_enabled:
+            result = self.vocabulary.resolve(normalized)
+            if result is not None:
+                self._count("fast_path")
+                return result, "fast_path"
+
+        key = get_extraction_key(get_content_hash(EXTRACT, EXTRACTION_MODEL, normalized, ""))
+        use_cache = not self.cache.bypass
+        if use_cache:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                self._count("cache_hits")
+                return json.loads(cached), "cache"
+
+        result = await extract_entities_and_intent(query)
+        self._count("llm_calls")
+        # Failed extractions come back without intents; don't cache those
+        if use_cache and result.get("intent"):
+            await self.cache.set(key, json.dumps(result, separators=(",", ":")))
+        return result, "llm"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queries": self.queries,
+                "fast_path": self.fast_path,
+                "cache_hits": self.cache_hits,
+                "llm_calls": self.llm_calls,
+                "fast_path_rate": round(self.fast_path / self.queries, 4) if self.queries else 0.0,
+                "cache": self.cache.stats()
+            }
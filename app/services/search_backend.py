@@ -0,0 +1,238 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+
+import numpy as np
+from pymongo import ASCENDING
+from starlette.concurrency import run_in_threadpool
+
+import app.context as context
+from app.services.aio import run_io
+from app.services.bm25 import build_search_index
+from app.services.pagination import InvalidCursor, keyset_filter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[search_backend]")
+
+SEARCH_SORT = [("final_score", -1), ("_id", -1)]
+RELEVANCE_WEIGHT = 0.3
+TEXT_WEIGHT = 0.7
+SEARCH_CANDIDATE_CAP = 1000  # best textScore matches blended per query; 0 blends every match
+INDEXED_FIELDS = {"title": 1, "description": 1, "relevance_score": 1}
+
+
+class SearchBackend(ABC):
+    """Full-text search over articles.
+
+    search() returns up to `limit` raw articles ranked by final_score (the text score blended
+    with relevance_score) and _id, after the keyset position `after`; each article carries
+    its text `score` and `final_score`. match_filter() returns (filter, capped): a MongoDB filter
+    selecting the matching articles, for callers that rank or count matches themselves, and
+    whether it was cut to the candidate_cap best matches.
+    """
+
+    name = None
+
+    @abstractmethod
+    async def search(self, query: str, limit: int, projection: dict, after: list | None = None) -> list:
+        ...
+
+    @abstractmethod
+    async def match_filter(self, query: str) -> tuple:
+        ...
+
+    def start(self):
+        # Background work of the backend, started and stopped with the app
+        pass
+
+    async def stop(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+def blend(text_score, relevance_score):
+    return RELEVANCE_WEIGHT * relevance_score + TEXT_WEIGHT * text_score
+
+
+class MongoTextSearch(SearchBackend):
+    """MongoDB $text index, ranked inside an aggregation.
+
+    The blend is computed with $addFields and followed by $sort + $limit, which MongoDB runs
+    as a bounded top-k sort, so only `limit` articles are kept in memory or sent back however
+    many documents match. Broad queries are first cut to the candidate_cap best textScore
+    matches, which also bounds the blending work (and how deep a query can be paged).
+    """
+
+    name = "mongo"
+
+    def __init__(self, candidate_cap: int = SEARCH_CANDIDATE_CAP):
+        self.candidate_cap = candidate_cap
+
+    async def search(self, query: str, limit: int, projection: dict, after: list | None = None) -> list:
+        pipeline = [{"$match": {"$text": {"$search": query}}}]
+        if self.candidate_cap:
+            pipeline += [{"$sort": {"score": {"$meta": "textScore"}}}, {"$limit": self.candidate_cap}]
+        pipeline += [
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+            {
+                "$addFields": {
+                    "final_score": {
+                        "$add": [
+                            {"$multiply": [RELEVANCE_WEIGHT, {"$ifNull": ["$relevance_score", 0]}]},
+                            {"$multiply": [TEXT_WEIGHT, "$score"]}
+                        ]
+                    }
+                }
+            }
+        ]
+        if after is not None:
+            pipeline.append({"$match": keyset_filter(SEARCH_SORT, after)})
+        pipeline += [
+            {"$sort": {"final_score": -1, "_id": -1}},
+            {"$limit": limit},
+            {"$project": {"score": 1, "final_score": 1, **projection}}
+        ]
+
+        cursor = await run_io(context.articles_collection.aggregate, pipeline)
+        results = await run_io(cursor.to_list)
+        logger.info(f"Ranked top {len(results)} articles for query: {query}")
+        return results
+
+    async def match_filter(self, query: str) -> tuple:
+        return {"$text": {"$search": query}}, False
+
+
+class BM25Search(SearchBackend):
+    """In-process BM25 index (app.services.bm25) with prefix and typo-tolerant matching.
+
+    BM25 scores are divided by the query's best score so they blend with relevance_score
+    on the same 0-1 scale; only the top `limit` articles are fetched from MongoDB. match_filter()
+    lists at most candidate_cap ids, the best-blended matches, so a broad query does not
+    become an unbounded $in.
+
+    The index is built from the articles collection at startup and, every refresh_seconds
+    (0 disables it), indexes the articles inserted since: those with an _id above the
+    greatest one indexed. Articles updated in place are re-indexed on restart.
+    """
+
+    name = "bm25"
+
+    def __init__(self, articles_collection, candidate_cap: int = SEARCH_CANDIDATE_CAP, refresh_seconds: float = 0):
+        # The sync collection: refreshes run in the threadpool, as indexing is CPU-bound anyway
+        self.articles_collection = articles_collection
+        self.candidate_cap = candidate_cap
+        self.refresh_seconds = refresh_seconds
+        self._task = None
+        self.refreshed = 0
+
+        articles = self._articles_after(None)
+        self.index = build_search_index(articles)
+        self._watermark = articles[-1]["_id"] if articles else None  # greatest indexed _id
+
+    def _articles_after(self, watermark) -> list:
+        query = {} if watermark is None else {"_id": {"$gt": watermark}}
+        return list(self.articles_collection.find(query, INDEXED_FIELDS).sort("_id", ASCENDING))
+
+    def _index_new_articles(self) -> int:
+        articles = self._articles_after(self._watermark)
+        if articles:
+            self.index.add_many(articles)
+            self._watermark = articles[-1]["_id"]
+        return len(articles)
+
+    async def refresh(self) -> int:
+        """Indexes the articles inserted since the last build or refresh; returns how many."""
+        added = await run_in_threadpool(self._index_new_articles)
+        if added:
+            self.refreshed += added
+            logger.info(f"Indexed {added} new articles for full-text search")
+        return added
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Failed to refresh the search index: {e}")
+
+    def start(self):
+        if self.refresh_seconds and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Refreshing the search index every {self.refresh_seconds}s")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _ranked(self, query: str) -> tuple:
+        keys, scores, relevance = self.index.scores(query)
+        if len(keys) == 0:
+            return keys, scores, scores
+        text_scores = scores / scores.max()
+        return keys, text_scores, blend(text_scores, relevance)
+
+    async def search(self, query: str, limit: int, projection: dict, after: list | None = None) -> list:
+        keys, text_scores, final_scores = self._ranked(query)
+        logger.info(f"Found {len(keys)} articles matching query: {query}")
+
+        candidates = np.arange(len(keys))
+        if after is not None:
+            after_score, after_id = after
+            try:
+                # Only articles tied with the cursor's score need their _id compared
+                ties = [i for i in np.flatnonzero(final_scores == after_score).tolist() if keys[i] < after_id]
+                below = np.flatnonzero(final_scores < after_score)
+            except TypeError:
+                raise InvalidCursor("Cursor does not match this sort order")
+            candidates = np.concatenate([below, np.array(ties, dtype=np.int64)])
+
+        if len(candidates) > limit:
+            # Everything scoring at least the limit-th best score, ties included
+            threshold = np.partition(final_scores[candidates], len(candidates) - limit)[len(candidates) - limit]
+            candidates = candidates[final_scores[candidates] >= threshold]
+        top = sorted(candidates.tolist(), key=lambda i: (final_scores[i], keys[i]), reverse=True)[:limit]
+        if not top:
+            return []
+
+        found = await run_io(context.articles_collection.find({"_id": {"$in": [keys[i] for i in top]}}, projection).to_list)
+        by_id = {article["_id"]: article for article in found}
+
+        results = []
+        for i in top:
+            article = by_id.get(keys[i])
+            if article is None:
+                continue  # deleted from MongoDB since it was indexed
+            article["score"] = float(text_scores[i])
+            article["final_score"] = float(final_scores[i])
+            results.append(article)
+        return results
+
+    async def match_filter(self, query: str) -> tuple:
+        keys, _, final_scores = self._ranked(query)
+        if not self.candidate_cap or len(keys) <= self.candidate_cap:
+            return {"_id": {"$in": list(keys)}}, False
+        best = np.argpartition(final_scores, len(keys) - self.candidate_cap)[len(keys) - self.candidate_cap:]
+        return {"_id": {"$in": [keys[i] for i in best.tolist()]}}, True
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "documents": len(self.index),
+            "refreshed": self.refreshed,
+            "refresh_seconds": self.refresh_seconds
+        }
+
+
+def create_search_backend(name: str, articles_collection, candidate_cap: int = SEARCH_CANDIDATE_CAP,
+                          refresh_seconds: float = 0) -> SearchBackend:
+    if name == "bm25":
+        return BM25Search(articles_collection, candidate_cap, refresh_seconds)
+    return MongoTextSearch(candidate_cap)
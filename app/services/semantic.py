@@ -0,0 +1,93 @@
+import asyncio
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+import app.context as context
+from app.services.aio import run_io
+from app.services.embeddings import article_text
+from app.services.vector_index import VectorIndex, write_vector_index
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[semantic]")
+
+SEMANTIC_SORT = [("similarity", -1), ("_id", -1)]
+HYBRID_SORT = [("hybrid_score", -1), ("_id", -1)]
+HYBRID_CANDIDATES = 100  # top text and top semantic matches fused per query
+HYBRID_SEMANTIC_WEIGHT = 0.5
+
+EMBED_PROJECTION = {"title": 1, "description": 1}
+
+
+def _article_batches(articles_collection, batch_size: int):
+    batch = []
+    for article in articles_collection.find({}, EMBED_PROJECTION).batch_size(batch_size):
+        batch.append(article)
+        if len(batch) == batch_size:
+            yield [a["_id"] for a in batch], [article_text(a) for a in batch]
+            batch = []
+    if batch:
+        yield [a["_id"] for a in batch], [article_text(a) for a in batch]
+
+
+def embed_articles(articles_collection, encoder, path: str, batch_size: int = 256) -> VectorIndex:
+    # Offline: encode every article into a float16 matrix on disk (manage.py embed)
+    count = articles_collection.count_documents({})
+    index = write_vector_index(path, encoder, _article_batches(articles_collection, batch_size), count)
+    logger.info(f"Wrote {len(index)} {encoder.name} embeddings to {path}")
+    return index
+
+
+def _search(query: str, limit: int, after: list | None) -> list:
+    vector = context.query_encoder.encode([query])[0]
+    return context.semantic_index.search(vector, limit, after)
+
+
+async def semantic_matches(query: str, limit: int, after: list | None = None) -> list:
+    """Returns up to limit (article _id, cosine similarity) pairs, most similar first."""
+    # Encoding and the matrix scan are CPU-bound; keep them off the event loop
+    return await run_in_threadpool(_search, query, limit, after)
+
+
+async def fetch_ranked(ranked: list, score_field: str, projection: dict) -> list:
+    # Articles for (_id, score) pairs, in the same order, with the score stored on each
+    if not ranked:
+        return []
+    found = await run_io(context.articles_collection.find({"_id": {"$in": [key for key, _ in ranked]}}, projection).to_list)
+    by_id = {article["_id"]: article for article in found}
+
+    articles = []
+    for key, score in ranked:
+        article = by_id.get(key)
+        if article is not None:
+            article[score_field] = score
+            articles.append(article)
+    return articles
+
+
+async def _no_matches() -> list:
+    return []
+
+
+async def hybrid_ranking(query: str, text_terms: str | None) -> list:
+    """Fuses the top text-search and semantic matches into (article _id, hybrid_score) pairs.
+
+    Each score is divided by its best value for the query before the weighted sum, so an
+    article found by only one retriever still ranks by how well it matched that one.
+    """
+    # The two retrievals are independent, so they run concurrently
+    semantic, found = await asyncio.gather(
+        semantic_matches(query, HYBRID_CANDIDATES) if context.semantic_index is not None else _no_matches(),
+        context.search_backend.search(text_terms, HYBRID_CANDIDATES, {"_id": 1}) if text_terms else _no_matches()
+    )
+    text = [(article["_id"], article.get("score", 0)) for article in found]
+
+    fused = {}
+    for matches, weight in ((semantic, HYBRID_SEMANTIC_WEIGHT), (text, 1 - HYBRID_SEMANTIC_WEIGHT)):
+        best = max((score for _, score in matches), default=0)
+        if best <= 0:
+            continue
+        for key, score in matches:
+            fused[key] = fused.get(key, 0.0) + weight * max(score, 0) / best
+
+    return sorted(fused.items(), key=lambda item: (item[1], item[0]), reverse=True)
@@ -3,35 +3,50 @@ import random
 from datetime import datetime, timedelta
 
 import app.context as context
+from app.services.aio import run_io
+from app.services.trending import reset_trending_state
+from app.services.utils import to_geo_point
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("[simulation_service]")
 
 
-def simulate_user_events(num_events=500):
+async def simulate_user_events(num_events=500):
     logger.info(f"Simulating {num_events} user events...")
-    articles = list(context.articles_collection.find())
+    articles = await run_io(context.articles_collection.find({}, {"_id": 0, "id": 1, "latitude": 1, "longitude": 1}).to_list)
     if not articles:
         return {"message": "No articles found. Load news data first."}
 
-    context.user_events_collection.delete_many({})  # Reset existing events
+    await run_io(context.user_events_collection.delete_many, {})  # Reset existing events
+    reset_trending_state()
 
+    events = []
     for _ in range(num_events):
         article = random.choice(articles)
         lat_jitter = random.uniform(-0.5, 0.5)
         lon_jitter = random.uniform(-0.5, 0.5)
 
+        event_lat = article["latitude"] + lat_jitter
+        event_lon = article["longitude"] + lon_jitter
+
         event = {
             "article_id": article["id"],
             "event_type": random.choice(["view", "click"]),
             "timestamp": datetime.utcnow() - timedelta(minutes=random.randint(0, 720)),  # up to 12 hrs ago
             "location": {
-                "lat": article["latitude"] + lat_jitter,
-                "lon": article["longitude"] + lon_jitter
-            }
+                "lat": event_lat,
+                "lon": event_lon
+            },
+            "geo": to_geo_point(event_lat, event_lon)
         }
 
-        context.user_events_collection.insert_one(event)
+        events.append(event)
+
+    # Same bulk path as POST /events
+    buffer = context.event_buffer
+    for start in range(0, len(events), buffer.max_batch_size):
+        await buffer.add_many(events[start:start + buffer.max_batch_size])
+    await buffer.flush()
     logger.info(f"Simulated {num_events} user events successfully.")
 
     return {"message": f"Simulated {num_events} user events."}
\ No newline at end of file
@@ -0,0 +1,38 @@
+import logging
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
+
+from app.services.llm import stream_summaries
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[sse]")
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+def summary_stream_response(articles: list, body: dict, response_model: type[BaseModel]) -> StreamingResponse:
+    """Streams a listing as Server-Sent Events.
+
+    A `page` event carries `body` (serialized through the route's response model) with the
+    summaries already known, sent as soon as the articles are fetched. Each missing summary
+    then follows as `summary_delta` events with its text as generated and a final `summary`
+    event; `done` ends the stream. Summary events identify the article by `index` and `_id`.
+    """
+    page = response_model.model_validate(body).model_dump(mode="json", by_alias=True)
+    summaries = [article["llm_summary"] for article in page["articles"]]
+
+    async def events():
+        yield sse_event("page", page)
+        async for event, index, text in stream_summaries(articles, summaries):
+            data = {"index": index, "_id": page["articles"][index]["_id"]}
+            data["delta" if event == "summary_delta" else "llm_summary"] = text
+            yield sse_event(event, data)
+        yield sse_event("done", {})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+
+from groq import RateLimitError
+from pymongo import UpdateOne
+
+import app.context as context
+from app.services.aio import run_io
+from app.services.llm import get_article_hash, request_summary, request_summary_batch
+from app.services.llm_gateway import LLMUnavailable
+from app.services.llm_providers import ProviderError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[summarization]")
+
+SUMMARY_PROJECTION = {"_id": 1, "title": 1, "description": 1, "llm_summary": 1, "summary_hash": 1}
+
+
+async def _summarize_with_backoff(article: dict, semaphore: asyncio.Semaphore, max_retries: int,
+                                  base_delay: float) -> str | None:
+    title = article.get("title", "")
+    description = article.get("description", "")
+
+    for attempt in range(max_retries + 1):
+        try:
+            async with semaphore:
+                return await request_summary(title, description)
+
+        except (RateLimitError, ProviderError, LLMUnavailable) as e:
+            # Still rate limited after the gateway's own retries, or its circuit is open
+            if isinstance(e, ProviderError) and e.status_code != 429:
+                logger.error(f"Error summarizing article {article['_id']}: {e}")
+                return None
+            if attempt == max_retries:
+                break
+            response = getattr(e, "response", None)
+            retry_after = response.headers.get("retry-after") if response is not None else None
+            delay = float(retry_after) if retry_after else base_delay * (2 ** attempt)
+            delay += random.uniform(0, base_delay)
+            logger.warning(f"Rate limited, retrying article {article['_id']} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        except Exception as e:
+            logger.error(f"Error summarizing article {article['_id']}: {e}")
+            return None
+
+    logger.error(f"Giving up on article {article['_id']} after {max_retries} retries")
+    return None
+
+
+async def _summarize_chunk(chunk: list, semaphore: asyncio.Semaphore, max_retries: int, base_delay: float) -> list:
+    # One batch prompt for the chunk; articles it misses are summarized one by one
+    summaries = [None] * len(chunk)
+    if len(chunk) > 1:
+        try:
+            async with semaphore:
+                summaries = await request_summary_batch(
+                    [(article.get("title", ""), article.get("description", "")) for article in chunk]
+                )
+        except Exception as e:
+            logger.error(f"Error batch-summarizing {len(chunk)} articles: {e}")
+
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+    results = await asyncio.gather(
+        *(_summarize_with_backoff(chunk[i], semaphore, max_retries, base_delay) for i in missing)
+    )
+    for i, summary in zip(missing, results):
+        summaries[i] = summary
+    return summaries
+
+
+async def _process_batch(batch: list, semaphore: asyncio.Semaphore, max_retries: int, base_delay: float) -> int:
+    size = context.summary_batch_size
+    chunk_summaries = await asyncio.gather(
+        *(_summarize_chunk(batch[start:start + size], semaphore, max_retries, base_delay)
+          for start in range(0, len(batch), size))
+    )
+    summaries = [summary for chunk in chunk_summaries for summary in chunk]
+
+    now = datetime.utcnow()
+    operations = []
+    for article, summary in zip(batch, summaries):
+        if not summary:
+            continue
+        operations.append(UpdateOne(
+            {"_id": article["_id"]},
+            {"$set": {
+                "llm_summary": summary,
+                "summary_hash": article["summary_hash_pending"],
+                "summarized_at": now
+            }}
+        ))
+
+    if operations:
+        await run_io(context.articles_collection.bulk_write, operations, ordered=False)
+    return len(operations)
+
+
+async def summarize_pending_articles(batch_size: int = 100, max_workers: int = 4, max_retries: int = 5,
+                                     base_delay: float = 1.0, force: bool = False) -> dict:
+    logger.info(f"Summarizing articles (batch_size={batch_size}, workers={max_workers}, force={force})")
+    started = time.monotonic()
+    scanned = skipped = updated = 0
+    semaphore = asyncio.Semaphore(max_workers)
+
+    cursor = context.articles_collection.find({}, SUMMARY_PROJECTION).batch_size(batch_size)
+    while True:
+        page = await run_io(cursor.to_list, batch_size)
+        if not page:
+            break
+
+        batch = []
+        for article in page:
+            scanned += 1
+            content_hash = get_article_hash(article.get("title", ""), article.get("description", ""))
+
+            # Only re-summarize articles whose title/description changed since the last run
+            if not force and article.get("llm_summary") and article.get("summary_hash") == content_hash:
+                skipped += 1
+                continue
+
+            article["summary_hash_pending"] = content_hash
+            batch.append(article)
+
+        if batch:
+            updated += await _process_batch(batch, semaphore, max_retries, base_delay)
+            logger.info(f"Progress: scanned={scanned}, updated={updated}, skipped={skipped}")
+
+    elapsed = time.monotonic() - started
+    failed = scanned - skipped - updated
+    logger.info(f"Summarization finished in {elapsed:.1f}s: updated={updated}, skipped={skipped}, failed={failed}")
+
+    return {"scanned": scanned, "updated": updated, "skipped": skipped, "failed": failed,
+            "elapsed_seconds": round(elapsed, 2)}
@@ -0,0 +1,55 @@
+import threading
+
+
+class SummaryMetrics:
+    """Counters for tuning SUMMARY_BATCH_SIZE: LLM calls per page summarized and tokens per article.
+
+    A page is one summarize_articles call with articles lacking a stored summary (the cache may
+    still answer them). Token counts come from the provider's usage report and so exclude
+    streamed summaries, which are only counted as calls.
+    """
+
+    def __init__(self, batch_size: int = 1):
+        self.batch_size = batch_size
+        self.pages = 0
+        self.calls = {"batch": 0, "single": 0, "stream": 0}
+        self.articles = 0  # summarized by a batch or single call
+        self.batch_fallbacks = 0  # articles a batch call missed, retried one by one
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def record_page(self):
+        with self._lock:
+            self.pages += 1
+
+    def record_call(self, kind: str, articles: int, usage=None):
+        with self._lock:
+            self.calls[kind] += 1
+            if kind != "stream":
+                self.articles += articles
+            if usage is not None:
+                self.prompt_tokens += usage.prompt_tokens or 0
+                self.completion_tokens += usage.completion_tokens or 0
+
+    def record_fallbacks(self, count: int):
+        with self._lock:
+            self.batch_fallbacks += count
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = sum(self.calls.values())
+            tokens = self.prompt_tokens + self.completion_tokens
+            return {
+                "batch_size": self.batch_size,
+                "pages": self.pages,
+                "llm_calls": calls,
+                "batch_calls": self.calls["batch"],
+                "single_calls": self.calls["single"],
+                "stream_calls": self.calls["stream"],
+                "batch_fallbacks": self.batch_fallbacks,
+                "calls_per_page": round(calls / self.pages, 2) if self.pages else 0.0,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "tokens_per_article": round(tokens / self.articles, 1) if self.articles else 0.0,
+            }
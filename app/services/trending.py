@@ -0,0 +1,128 @@
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import app.context as context
+from app.services.aio import run_io
+from app.services.geo_index import EVENT_WEIGHTS, GeoIndex, add_events, get_event_weight
+from app.services.trending_engine import TrendingEngine
+from app.services.utils import haversine, to_geo_point
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[trending_service]")
+
+
+async def _scores_from_aggregation(lat: float, lon: float, radius: float, limit: int) -> dict:
+    # Geo filter, time window, scoring and grouping all run inside MongoDB;
+    # only one (article_id, score) pair per trending article crosses the wire.
+    now = datetime.utcnow()
+    weight = {
+        "$switch": {
+            "branches": [{"case": {"$eq": ["$event_type", t]}, "then": w} for t, w in EVENT_WEIGHTS.items()],
+            "default": 1
+        }
+    }
+    hours_ago = {"$divide": [{"$subtract": [now, "$timestamp"]}, 3600 * 1000]}
+
+    pipeline = [
+        {
+            "$geoNear": {
+                "near": to_geo_point(lat, lon),
+                "key": "geo",
+                "distanceField": "distance",
+                "maxDistance": radius * 1000,  # meters
+                "distanceMultiplier": 0.001,  # km
+                "query": {"timestamp": {"$gte": now - timedelta(hours=context.trending_window_hours)}},
+                "spherical": True
+            }
+        },
+        {
+            "$project": {
+                "article_id": 1,
+                "score": {
+                    "$multiply": [
+                        weight,
+                        {"$divide": [1, {"$add": [hours_ago, 1]}]},  # decay
+                        {"$subtract": [1, {"$divide": ["$distance", radius]}]}  # proximity
+                    ]
+                }
+            }
+        },
+        {"$group": {"_id": "$article_id", "score": {"$sum": "$score"}}},
+        {"$sort": {"score": -1}},
+        {"$limit": limit}
+    ]
+    cursor = await run_io(context.user_events_collection.aggregate, pipeline)
+    return {doc["_id"]: doc["score"] for doc in await run_io(cursor.to_list)}
+
+
+async def _scores_from_scan(lat: float, lon: float, radius: float) -> dict:
+    now = datetime.utcnow()
+    trending_scores = defaultdict(lambda: 0)
+
+    since = now - timedelta(hours=context.trending_window_hours)
+    events = await run_io(context.user_events_collection.find({"timestamp": {"$gte": since}}).to_list)
+
+    for event in events:
+        ev_lat = event["location"]["lat"]
+        ev_lon = event["location"]["lon"]
+        distance = haversine(lat, lon, ev_lat, ev_lon)
+
+        if distance <= radius:
+            time_diff = (now - event["timestamp"]).total_seconds() / 3600  # in hours
+            decay = 1 / (time_diff + 1)
+            base = get_event_weight(event["event_type"])
+            proximity = 1 - (distance / radius)
+
+            trending_scores[event["article_id"]] += base * decay * proximity
+
+    return trending_scores
+
+
+def _scores_from_geo_index(lat: float, lon: float, radius: float) -> dict:
+    index = context.event_geo_index
+    offsets, distances = index.query_radius(lat, lon, radius)
+
+    hours = (time.time() - index.column("timestamp", offsets)) / 3600
+    in_window = hours <= context.trending_window_hours
+    offsets, distances, hours = offsets[in_window], distances[in_window], hours[in_window]
+    if len(offsets) == 0:
+        return {}
+
+    scores = index.column("weight", offsets) / (hours + 1) * (1 - distances / radius)
+
+    # Sum event scores per article
+    article_ids, inverse = np.unique(index.keys(offsets).astype(str), return_inverse=True)
+    totals = np.bincount(inverse, weights=scores)
+    return dict(zip(article_ids.tolist(), totals.tolist()))
+
+
+async def compute_trending_scores(lat: float, lon: float, radius: float, limit: int) -> dict:
+    # Returns at least the top `limit` article_id -> score pairs (some backends return all of them)
+    if context.trending_backend == "engine" and context.trending_engine is not None:
+        return context.trending_engine.scores(lat, lon, radius, max_age_hours=context.trending_window_hours)
+    if context.trending_backend == "memory" and context.event_geo_index is not None:
+        return _scores_from_geo_index(lat, lon, radius)
+    if context.trending_backend == "scan":
+        return await _scores_from_scan(lat, lon, radius)
+    return await _scores_from_aggregation(lat, lon, radius, limit)
+
+
+def record_events(events):
+    # Keep the in-process trending state in sync with inserts into user_events
+    if context.event_geo_index is not None:
+        add_events(context.event_geo_index, events)
+    if context.trending_engine is not None:
+        context.trending_engine.record_events(events)
+
+
+def reset_trending_state():
+    if context.event_geo_index is not None:
+        context.event_geo_index = GeoIndex(cell_degrees=context.event_geo_index.cell_degrees,
+                                           columns=("weight", "timestamp"))
+    if context.trending_engine is not None:
+        context.trending_engine = TrendingEngine(cell_degrees=context.trending_engine.cell_degrees,
+                                                 half_life_hours=context.trending_engine.half_life_hours)
@@ -1,29 +1,145 @@
+import asyncio
 import json
 import logging
+import math
+import random
+import time
+import uuid
 
 import app.context as context
+from app.services.aio import run_io
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("[trending_cache]")
 
-TRENDING_TTL_SECONDS = 300  # 5 minutes
+TRENDING_TTL_SECONDS = 300  # 5 minutes until an entry is considered stale
+TRENDING_STALE_SECONDS = 300  # stale entries are still served while a refresh runs
+TRENDING_EARLY_EXPIRY_BETA = 1.0  # > 1 favours earlier refreshes
+TRENDING_LOCK_SECONDS = 30
+TRENDING_LOCK_WAIT_SECONDS = 2
 
+# key -> asyncio.Task computing that key in this process
+_inflight = {}
 
-def get_geo_key(lat: float, lon: float, precision: int = 1) -> str:
+
+def get_geo_key(lat: float, lon: float, radius: float, limit: int, precision: int = 1) -> str:
     rounded_lat = round(lat, precision)
     rounded_lon = round(lon, precision)
-    return f"trending:{rounded_lat}:{rounded_lon}"
+    return f"trending:{rounded_lat}:{rounded_lon}:{radius:g}:{limit}"
+
+
+def _should_refresh_early(entry: dict, now: float) -> bool:
+    # Probabilistic early expiration (XFetch): the closer to expiry and the slower the
+    # recomputation, the more likely a request refreshes ahead of time.
+    expires_at = entry["t"] + TRENDING_TTL_SECONDS
+    return now - entry["d"] * TRENDING_EARLY_EXPIRY_BETA * math.log(random.random() or 1e-12) >= expires_at
+
+
+async def _read_entry(key: str) -> dict | None:
+    try:
+        cached = await run_io(context.redis_client.get, key)
+    except Exception as e:
+        logger.warning(f"Redis lookup failed for {key}: {e}")
+        return None
+    return json.loads(cached) if cached else None
+
+
+async def _write_entry(key: str, articles: list, compute_seconds: float):
+    entry = {"v": articles, "t": time.time(), "d": round(compute_seconds, 3)}
+    payload = json.dumps(entry, separators=(",", ":"), default=str)
+    try:
+        await run_io(context.redis_client.setex, key, TRENDING_TTL_SECONDS + TRENDING_STALE_SECONDS, payload)
+        logger.info(f"Cached trending articles for {key} with TTL {TRENDING_TTL_SECONDS} seconds")
+    except Exception as e:
+        logger.warning(f"Redis write failed for {key}: {e}")
+
+
+async def _acquire_lock(key: str) -> str | None:
+    token = uuid.uuid4().hex
+    try:
+        acquired = await run_io(context.redis_client.set, f"lock:{key}", token, nx=True, ex=TRENDING_LOCK_SECONDS)
+    except Exception as e:
+        logger.warning(f"Redis lock failed for {key}: {e}")
+        return token  # Redis trouble: fall back to in-process single-flight only
+    return token if acquired else None
+
+
+async def _release_lock(key: str, token: str):
+    try:
+        lock_key = f"lock:{key}"
+        if await run_io(context.redis_client.get, lock_key) == token:
+            await run_io(context.redis_client.delete, lock_key)
+    except Exception as e:
+        logger.warning(f"Redis unlock failed for {key}: {e}")
+
 
+async def _compute_and_store(key: str, compute) -> list:
+    started = time.monotonic()
+    articles = await compute()
+    await _write_entry(key, articles, time.monotonic() - started)
+    return articles
 
-def get_cached_trending(lat: float, lon: float) -> list | None:
-    key = get_geo_key(lat, lon)
-    cached = context.redis_client.get(key)
-    if cached:
-        return json.loads(cached)
+
+async def _wait_for_other_worker(key: str) -> dict | None:
+    deadline = time.monotonic() + TRENDING_LOCK_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        entry = await _read_entry(key)
+        if entry is not None:
+            return entry
     return None
 
 
-def set_cached_trending(lat: float, lon: float, articles: list):
-    key = get_geo_key(lat, lon)
-    context.redis_client.setex(key, TRENDING_TTL_SECONDS, json.dumps(articles))
-    logger.info(f"Cached trending articles for {key} with TTL {TRENDING_TTL_SECONDS} seconds")
\ No newline at end of file
+async def _recompute(key: str, compute, wait_for_others: bool) -> list | None:
+    token = await _acquire_lock(key)
+    if token is None:
+        # Another worker is recomputing this key
+        if not wait_for_others:
+            return None
+        entry = await _wait_for_other_worker(key)
+        if entry is not None:
+            return entry["v"]
+        return await _compute_and_store(key, compute)
+
+    try:
+        return await _compute_and_store(key, compute)
+    finally:
+        await _release_lock(key, token)
+
+
+def _single_flight(key: str, compute, wait_for_others: bool = True) -> asyncio.Task:
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_recompute(key, compute, wait_for_others))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return task
+
+
+def _log_refresh_failure(key: str, task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background refresh of {key} failed: {task.exception()}")
+
+
+def _refresh_in_background(key: str, compute):
+    if key in _inflight:
+        return
+    task = _single_flight(key, compute, wait_for_others=False)
+    task.add_done_callback(lambda t: _log_refresh_failure(key, t))
+
+
+async def get_or_compute_trending(lat: float, lon: float, radius: float, limit: int, compute) -> tuple:
+    """Returns (articles, cache_hit). `compute` is an async callable producing the articles."""
+    key = get_geo_key(lat, lon, radius, limit)
+    entry = await _read_entry(key)
+    now = time.time()
+
+    if entry is not None:
+        age = now - entry["t"]
+        if age >= TRENDING_TTL_SECONDS or _should_refresh_early(entry, now):
+            # Stale-while-revalidate: serve the previous value, refresh once in the background
+            _refresh_in_background(key, compute)
+        return entry["v"], True
+
+    # shield: a cancelled request must not cancel the computation other requests share
+    return await asyncio.shield(_single_flight(key, compute)), False
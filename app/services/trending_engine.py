@@ -0,0 +1,109 @@
+import logging
+import math
+import threading
+import time
+from datetime import timezone
+
+from app.services.geo_index import KM_PER_DEGREE, cell_center, cell_of, cells_in_radius, get_event_weight
+from app.services.utils import haversine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[trending_engine]")
+
+PRUNE_THRESHOLD = 1e-3
+
+
+class TrendingEngine:
+    """Per-geocell, per-article exponentially decayed event counters.
+
+    Each counter stores (score, updated_at); decay is applied lazily when an event is
+    recorded or the counter is read, so a trending query only touches the cells around
+    the user instead of every event ever recorded.
+    """
+
+    def __init__(self, cell_degrees: float = 0.25, half_life_hours: float = 6.0):
+        self.cell_degrees = cell_degrees
+        self.half_life_hours = half_life_hours
+        self._decay_rate = math.log(2) / (half_life_hours * 3600)
+        # How far an event can be from its cell centre, at most (cells are no wider than they are tall)
+        self._cell_half_diagonal_km = math.sqrt(2) * cell_degrees * KM_PER_DEGREE / 2
+
+        self._cells = {}  # (row, col) -> {article_id: [score, updated_at]}
+        self._lock = threading.Lock()
+        self.events_recorded = 0
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * math.exp(-self._decay_rate * max(now - updated_at, 0.0))
+
+    def record(self, lat: float, lon: float, article_id: str, weight: float, timestamp: float):
+        cell = cell_of(lat, lon, self.cell_degrees)
+        with self._lock:
+            counters = self._cells.setdefault(cell, {})
+            counter = counters.get(article_id)
+            if counter is None:
+                counters[article_id] = [weight, timestamp]
+            elif timestamp >= counter[1]:
+                counter[0] = self._decayed(counter[0], counter[1], timestamp) + weight
+                counter[1] = timestamp
+            else:
+                # Late event: decay it to the counter's reference time instead
+                counter[0] += self._decayed(weight, timestamp, counter[1])
+            self.events_recorded += 1
+
+    def record_events(self, events):
+        for event in events:
+            self.record(
+                event["location"]["lat"],
+                event["location"]["lon"],
+                event["article_id"],
+                get_event_weight(event["event_type"]),
+                event["timestamp"].replace(tzinfo=timezone.utc).timestamp()
+            )
+
+    def scores(self, lat: float, lon: float, radius_km: float, max_age_hours: float | None = None,
+               now: float | None = None) -> dict:
+        now = time.time() if now is None else now
+        # Counters only keep their latest update time, so the window drops counters with no recent events
+        oldest = now - max_age_hours * 3600 if max_age_hours is not None else float("-inf")
+        scores = {}
+
+        with self._lock:
+            for cell in cells_in_radius(lat, lon, radius_km, self.cell_degrees):
+                counters = self._cells.get(cell)
+                if not counters:
+                    continue
+
+                # Proximity uses the cell's nearest possible point: the centre distance less the half
+                # diagonal, so events in the user's own cell or one next to it count at full weight
+                center_lat, center_lon = cell_center(cell, self.cell_degrees)
+                distance = max(0.0, haversine(lat, lon, center_lat, center_lon) - self._cell_half_diagonal_km)
+                proximity = 1 - distance / radius_km
+                if proximity <= 0:
+                    continue
+
+                expired = []
+                for article_id, (score, updated_at) in counters.items():
+                    if updated_at < oldest:
+                        continue
+                    decayed = self._decayed(score, updated_at, now)
+                    if decayed < PRUNE_THRESHOLD:
+                        expired.append(article_id)
+                        continue
+                    scores[article_id] = scores.get(article_id, 0) + decayed * proximity
+
+                for article_id in expired:
+                    del counters[article_id]
+                if not counters:
+                    del self._cells[cell]
+
+        return scores
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cells": len(self._cells),
+                "counters": sum(len(counters) for counters in self._cells.values()),
+                "events_recorded": self.events_recorded,
+                "half_life_hours": self.half_life_hours,
+                "cell_degrees": self.cell_degrees
+            }
@@ -1,5 +1,18 @@
+import re
+import unicodedata
 from math import radians, cos, sin, sqrt, atan2
 
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "he", "in", "is", "it", "its",
+    "of", "on", "or", "that", "the", "to", "was", "were", "will", "with",
+}
+
+_TOKEN = re.compile(r"\w+")
+
 
 def haversine(lat1, lon1, lat2, lon2):
     R = 6371  # Earth radius in km
@@ -8,4 +21,29 @@ def haversine(lat1, lon1, lat2, lon2):
     a = sin(dlat / 2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2)**2
     c = 2 * atan2(sqrt(a), sqrt(1 - a))
 
-    return R * c
\ No newline at end of file
+    return R * c
+
+
+def to_geo_point(lat, lon):
+    # GeoJSON stores coordinates as [longitude, latitude]
+    return {"type": "Point", "coordinates": [lon, lat]}
+
+
+def normalize_key(value: str) -> str:
+    # Lookup key stored next to category / source_name; must match the $toLower/$trim backfill
+    return value.strip().lower()
+
+
+def haversine_np(lat, lon, lats, lons):
+    # Vectorized haversine from one point to arrays of points, in km
+    lat1 = np.radians(lat)
+    lats2 = np.radians(lats)
+    dlat = lats2 - lat1
+    dlon = np.radians(lons) - np.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lats2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def tokenize(text: str) -> list:
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return [token for token in _TOKEN.findall(text) if token not in STOP_WORDS]
\ No newline at end of file
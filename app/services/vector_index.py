@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+
+import numpy as np
+from bson import ObjectId
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[vector_index]")
+
+CHUNK_ROWS = 65536  # rows scored per matrix product, bounding float32 temporaries
+
+MATRIX_FILE = "vectors.f16.npy"
+KEYS_FILE = "keys.json"
+META_FILE = "meta.json"
+
+
+class VectorIndex:
+    """Exact cosine top-k over a float16 matrix of unit vectors, one row per article.
+
+    The matrix may be a read-only memory map; rows are scored in chunks of CHUNK_ROWS,
+    keeping only each chunk's best candidates, so memory stays bounded by the chunk size.
+    """
+
+    def __init__(self, matrix: np.ndarray, keys: list, encoder: str):
+        self.matrix = matrix
+        self.keys = keys
+        self.encoder = encoder
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def from_vectors(cls, vectors: np.ndarray, keys: list, encoder: str) -> "VectorIndex":
+        return cls(np.asarray(vectors, dtype=np.float16), list(keys), encoder)
+
+    def _chunks(self):
+        for start in range(0, len(self.keys), CHUNK_ROWS):
+            yield start, self.matrix[start:start + CHUNK_ROWS].astype(np.float32)
+
+    def scores(self, vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        return np.concatenate([chunk @ vector for _, chunk in self._chunks()]) if self.keys else np.zeros(0)
+
+    def search(self, vector: np.ndarray, k: int, after: list | None = None) -> list:
+        """Returns up to k (key, similarity) pairs, best first, after the keyset position (similarity, key)."""
+        scores = self.scores(vector)
+        candidates = np.arange(len(scores))
+        if after is not None:
+            after_score, after_key = after
+            ties = [i for i in np.flatnonzero(scores == np.float32(after_score)).tolist() if self.keys[i] < after_key]
+            candidates = np.concatenate([np.flatnonzero(scores < np.float32(after_score)), np.array(ties, dtype=np.int64)])
+        return self._top(candidates, scores, k)
+
+    def _top(self, candidates: np.ndarray, scores: np.ndarray, k: int) -> list:
+        if len(candidates) > k:
+            threshold = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+            candidates = candidates[scores[candidates] >= threshold]
+        top = sorted(candidates.tolist(), key=lambda i: (scores[i], self.keys[i]), reverse=True)[:k]
+        return [(self.keys[i], float(scores[i])) for i in top]
+
+    def stats(self) -> dict:
+        return {
+            "encoder": self.encoder,
+            "documents": len(self.keys),
+            "dimensions": self.matrix.shape[1],
+            "memory_mapped": isinstance(self.matrix, np.memmap)
+        }
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, MATRIX_FILE), np.asarray(self.matrix, dtype=np.float16))
+        self._save_metadata(path, self.keys, self.encoder, self.matrix.shape[1])
+
+    @staticmethod
+    def _save_metadata(path: str, keys: list, encoder: str, dimensions: int):
+        with open(os.path.join(path, KEYS_FILE), "w", encoding="utf-8") as f:
+            json.dump([str(key) for key in keys], f)
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"encoder": encoder, "dimensions": dimensions, "count": len(keys)}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "VectorIndex | None":
+        if not os.path.exists(os.path.join(path, META_FILE)):
+            return None
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(path, KEYS_FILE), "r", encoding="utf-8") as f:
+            keys = [ObjectId(key) if ObjectId.is_valid(key) else key for key in json.load(f)]
+        matrix = np.load(os.path.join(path, MATRIX_FILE), mmap_mode="r" if mmap else None)
+        return cls(matrix[:len(keys)], keys, meta["encoder"])
+
+
+def write_vector_index(path: str, encoder, batches, count: int) -> VectorIndex:
+    """Encodes (keys, texts) batches straight into a float16 .npy memory map under path."""
+    os.makedirs(path, exist_ok=True)
+    matrix = np.lib.format.open_memmap(
+        os.path.join(path, MATRIX_FILE), mode="w+", dtype=np.float16, shape=(count, encoder.dimensions)
+    )
+
+    keys = []
+    for batch_keys, texts in batches:
+        batch_keys = batch_keys[:count - len(keys)]  # articles added after counting are left out
+        if not batch_keys:
+            break
+        matrix[len(keys):len(keys) + len(batch_keys)] = encoder.encode(texts[:len(batch_keys)])
+        keys.extend(batch_keys)
+        logger.info(f"Embedded {len(keys)}/{count} articles")
+
+    matrix.flush()
+    VectorIndex._save_metadata(path, keys, encoder.name, encoder.dimensions)
+    return VectorIndex(matrix[:len(keys)], keys, encoder.name)
@@ -0,0 +1,153 @@
+"""Synthetic article and event corpora derived from data/news_data.json, for benchmarks and load tests.
+
+Article i is a variant of source article i % N: the first N are the originals, later copies
+get a new id, another article's description (so summaries and cache keys differ), a location
+jittered by up to half a degree and a publication date moved back by up to 30 days. Events
+follow POST /simulate: views and clicks on random articles, near the article, within 12 hours.
+
+Usage:
+    python -m benchmarks.corpus --mongo-uri mongodb://localhost:27017 --db news_bench --articles 100000
+"""
+import argparse
+import copy
+import json
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+from app.services.load_data import LOAD_BATCH_SIZE, ensure_article_indexes, iter_json_records, prepare_article
+from app.services.utils import to_geo_point
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[corpus]")
+
+LOCATION_JITTER_DEGREES = 0.5
+DATE_SPREAD_DAYS = 30
+EVENT_WINDOW_MINUTES = 720  # matches POST /simulate
+
+
+def load_source_articles(path: str) -> list:
+    return [article for article in iter_json_records(path) if isinstance(article, dict) and article.get("id")]
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return min(high, max(low, value))
+
+
+def _jitter_location(article: dict, rng: random.Random, degrees: float) -> tuple:
+    lat = _clamp(article["latitude"] + rng.uniform(-degrees, degrees), -90, 90)
+    lon = _clamp(article["longitude"] + rng.uniform(-degrees, degrees), -180, 180)
+    return lat, lon
+
+
+def article_id(source: list, i: int) -> str:
+    copy_number, position = divmod(i, len(source))
+    base_id = source[position]["id"]
+    return base_id if copy_number == 0 else f"{base_id}-{copy_number}"
+
+
+def synthetic_articles(source: list, count: int, seed: int = 0):
+    """Yields count articles as read from a data file (before prepare_article)."""
+    rng = random.Random(seed)
+    for i in range(count):
+        article = copy.deepcopy(source[i % len(source)])
+        if i >= len(source):
+            article["id"] = article_id(source, i)
+            article["description"] = source[rng.randrange(len(source))].get("description")
+            if article.get("latitude") is not None:
+                article["latitude"], article["longitude"] = _jitter_location(article, rng, LOCATION_JITTER_DEGREES)
+            if isinstance(article.get("publication_date"), str):
+                published = datetime.fromisoformat(article["publication_date"])
+                article["publication_date"] = (published - timedelta(days=rng.uniform(0, DATE_SPREAD_DAYS))).isoformat()
+            if isinstance(article.get("relevance_score"), (int, float)):
+                score = article["relevance_score"] + rng.uniform(-0.05, 0.05)
+                article["relevance_score"] = round(_clamp(score, 0, 1), 4)
+        yield article
+
+
+def synthetic_events(source: list, article_count: int, count: int, seed: int = 0):
+    """Yields count user_events documents on the first article_count synthetic articles."""
+    rng = random.Random(seed + 1)
+    located = [i for i, article in enumerate(source) if article.get("latitude") is not None]
+    copies = max(1, article_count // len(source))
+    now = datetime.utcnow()
+    for _ in range(count):
+        i = rng.choice(located) + len(source) * rng.randrange(copies)
+        article = source[i % len(source)]
+        lat, lon = _jitter_location(article, rng, LOCATION_JITTER_DEGREES)
+        yield {
+            "article_id": article_id(source, i),
+            "event_type": rng.choice(["view", "click"]),
+            "timestamp": now - timedelta(minutes=rng.randint(0, EVENT_WINDOW_MINUTES)),
+            "location": {"lat": lat, "lon": lon},
+            "geo": to_geo_point(lat, lon)
+        }
+
+
+def _insert_batches(collection, documents, batch_size: int) -> int:
+    inserted, batch = 0, []
+    for document in documents:
+        batch.append(document)
+        if len(batch) == batch_size:
+            collection.insert_many(batch, ordered=False)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+    return inserted
+
+
+def seed_articles(db, source: list, count: int, seed: int = 0, batch_size: int = LOAD_BATCH_SIZE) -> dict:
+    """Replaces db.articles with count synthetic articles and builds the article indexes.
+
+    Articles go through prepare_article like `manage.py load`, but as plain inserts into
+    an emptied collection, which is faster than upserts at these sizes.
+    """
+    started = time.perf_counter()
+    db["articles"].drop()
+    documents = (prepare_article(article) for article in synthetic_articles(source, count, seed))
+    inserted = _insert_batches(db["articles"], documents, batch_size)
+    ensure_article_indexes(db["articles"])
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Seeded {inserted} articles in {elapsed:.1f}s")
+    return {"articles": inserted, "seconds": round(elapsed, 3), "articles_per_second": round(inserted / elapsed)}
+
+
+def seed_events(db, source: list, article_count: int, count: int, seed: int = 0,
+                batch_size: int = LOAD_BATCH_SIZE) -> dict:
+    # Reseeded on every run: event timestamps are relative to now and age out of the trending window
+    started = time.perf_counter()
+    db["user_events"].drop()
+    recorded = _insert_batches(db["user_events"], synthetic_events(source, article_count, count, seed), batch_size)
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Seeded {recorded} events in {elapsed:.1f}s")
+    return {"events": recorded, "seconds": round(elapsed, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data/news_data.json")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="news_bench")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=None, help="Default: one per two articles")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    source = load_source_articles(args.data)
+    events = args.events if args.events is not None else args.articles // 2
+    db = MongoClient(args.mongo_uri)[args.db]
+    print(json.dumps({
+        "articles": seed_articles(db, source, args.articles, args.seed),
+        "events": seed_events(db, source, args.articles, events, args.seed)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Micro-benchmark: in-memory GeoIndex vs the per-point haversine loop used by /nearby and /trending.
+
+Usage:
+    python -m benchmarks.geo_index_bench [--sizes 10000 100000 1000000] [--queries 20]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+import numpy as np
+
+from app.services.geo_index import GeoIndex
+from app.services.utils import haversine
+
+# Roughly the bounding box of the coordinates in data/news_data.json
+LAT_RANGE = (8.0, 35.0)
+LON_RANGE = (68.0, 97.0)
+
+
+def loop_nearest(points, lat, lon, k, radius):
+    matches = []
+    for point_lat, point_lon, key in points:
+        distance = haversine(lat, lon, point_lat, point_lon)
+        if distance <= radius:
+            matches.append((distance, key))
+    return sorted(matches)[:k]
+
+
+def time_queries(fn, queries):
+    timings = []
+    for lat, lon in queries:
+        started = time.perf_counter()
+        fn(lat, lon)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(timings), 3)
+    }
+
+
+def run(size, num_queries, k, radius, seed):
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(*LAT_RANGE, size)
+    lons = rng.uniform(*LON_RANGE, size)
+    keys = np.arange(size)
+
+    started = time.perf_counter()
+    index = GeoIndex(cell_degrees=1.0)
+    index.add_many(lats, lons, keys)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    queries = [(random.uniform(*LAT_RANGE), random.uniform(*LON_RANGE)) for _ in range(num_queries)]
+    points = list(zip(lats.tolist(), lons.tolist(), keys.tolist()))
+
+    # The Python loop gets slow at 1M points; cap its queries so the run stays short
+    loop_queries = queries[:max(1, min(num_queries, 2_000_000 // size))]
+    loop = summarize(time_queries(lambda lat, lon: loop_nearest(points, lat, lon, k, radius), loop_queries))
+    grid = summarize(time_queries(lambda lat, lon: index.nearest(lat, lon, k, radius), queries))
+
+    return {
+        "points": size,
+        "k": k,
+        "radius_km": radius,
+        "index_build_ms": round(build_ms, 1),
+        "loop": loop,
+        "geo_index": grid,
+        "speedup_p50": round(loop["p50_ms"] / grid["p50_ms"], 1) if grid["p50_ms"] else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--radius", type=float, default=100.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = [run(size, args.queries, args.k, args.radius, args.seed) for size in args.sizes]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+"""End-to-end load test: boots the app against local stand-ins and drives every route concurrently.
+
+For each corpus size, seeds a synthetic corpus derived from data/news_data.json (benchmarks/corpus.py),
+starts the app with the fake LLM provider, then sends --requests requests per scenario from
+--concurrency concurrent clients over an in-process ASGI transport (no sockets or HTTP parsing).
+Reports, per scenario: p50/p95/p99 latency, throughput, status codes, and MongoDB operations and
+LLM calls per request, as JSON. Runs record the commit, so two result files can be diffed, or
+passed back in with --baseline to add per-scenario changes.
+
+Stand-ins:
+  --mongo mongomock          in memory, for the 2k corpus; runs the blocking clients and the
+                             in-process search/nearby/trending backends (bm25, memory, engine),
+                             since mongomock has no $text or $geoNear
+  --mongo mongodb://...      a local mongod for 100k/1M; each size gets its own <db>_<size> database,
+                             dropped and reseeded unless --reuse finds it already seeded
+  --redis fakeredis | redis://...
+The LLM is always LLM_PROVIDER=fake, with latency and error rate from --llm-latency/--llm-error-rate.
+Other settings (ASYNC_MODE, SEARCH_BACKEND, SUMMARY_BATCH_SIZE, ...) come from the environment
+and configs/.env as usual.
+
+Usage:
+    python -m benchmarks.load_test [--sizes 2000] [--requests 200] [--concurrency 16] [--output results.json]
+    python -m benchmarks.load_test --mongo mongodb://localhost:27017 --sizes 2000 100000 1000000 --reuse
+    python -m benchmarks.load_test --baseline results.json --output results-new.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import types
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+import httpx
+from pymongo import MongoClient, monitoring
+
+import app as app_module
+import app.context as context
+from app.services.embeddings import create_encoder
+from app.services.semantic import embed_articles
+from app.services.utils import tokenize
+from benchmarks.corpus import load_source_articles, seed_articles, seed_events
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("[load_test]")
+logging.getLogger("httpx").setLevel(logging.WARNING)  # one line per request otherwise
+
+API_PREFIX = "/api/v1/news"
+SETTLE_SECONDS = 10  # wait for summaries still being generated after their responses went out
+
+# Connection handshakes and authentication are not the app's queries
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "buildInfo", "endSessions", "saslStart", "saslContinue"}
+
+MONGOMOCK_METHODS = (
+    "find", "find_one", "aggregate", "count_documents", "estimated_document_count", "distinct",
+    "insert_one", "insert_many", "update_one", "update_many", "bulk_write", "delete_many"
+)
+
+
+class MongoOperationCounter(monitoring.CommandListener):
+    """Counts MongoDB commands (mongod) or collection method calls (mongomock) by name."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+    def snapshot(self) -> Counter:
+        with self._lock:
+            return Counter(self.counts)
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.record(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def use_mongomock(counter: MongoOperationCounter):
+    """Returns a mongomock client standing in for MongoClient, counting collection calls.
+
+    mongomock isn't thread-safe and the blocking clients run in the threadpool, so calls are
+    serialized; it also lacks PyMongo 4's Cursor.to_list, which the routes use.
+    """
+    try:
+        import mongomock
+        from mongomock.collection import Collection, Cursor
+        from mongomock.command_cursor import CommandCursor
+    except ImportError:
+        raise RuntimeError("--mongo mongomock requires `pip install mongomock`")
+
+    lock = threading.RLock()
+    local = threading.local()
+
+    def counted(name, method):
+        def wrapper(self, *args, **kwargs):
+            # mongomock calls its own methods internally; only the outermost call is the app's
+            depth = getattr(local, "depth", 0)
+            if depth == 0:
+                counter.record(name)
+            local.depth = depth + 1
+            try:
+                with lock:
+                    return method(self, *args, **kwargs)
+            finally:
+                local.depth = depth
+        return wrapper
+
+    def to_list(self, length=None):
+        with lock:
+            return list(itertools.islice(self, length)) if length else list(self)
+
+    for name in MONGOMOCK_METHODS:
+        setattr(Collection, name, counted(name, getattr(Collection, name)))
+    Cursor.to_list = CommandCursor.to_list = to_list
+    return mongomock.MongoClient()
+
+
+def use_fakeredis():
+    # Stands in for the redis module App connects with; one server per corpus size
+    try:
+        import fakeredis
+    except ImportError:
+        raise RuntimeError("--redis fakeredis requires `pip install fakeredis`")
+
+    server = fakeredis.FakeServer()
+
+    def client_factory(client_class):
+        return types.SimpleNamespace(from_url=lambda url, **kwargs: client_class(server=server, **kwargs))
+
+    return types.SimpleNamespace(
+        StrictRedis=client_factory(fakeredis.FakeStrictRedis),
+        asyncio=types.SimpleNamespace(StrictRedis=client_factory(fakeredis.FakeAsyncRedis))
+    )
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    make_request: Callable  # rng -> (params, json body)
+    max_requests: int | None = None
+
+
+def build_scenarios(source: list) -> list:
+    """Requests for every route, with parameters drawn from the source articles."""
+    categories = [c for c, _ in Counter(c for a in source for c in a.get("category") or []).most_common(10)]
+    sources = [s for s, _ in Counter(a["source_name"] for a in source if a.get("source_name")).most_common(10)]
+    word_counts = Counter(token for a in source for token in set(tokenize(a.get("title") or "")) if len(token) > 3)
+    words = [w for w, _ in word_counts.most_common(200)[20:]]  # frequent, but not the most common words
+    titles = [a["title"] for a in source if a.get("title")]
+    places = [(a["latitude"], a["longitude"]) for a in source if a.get("latitude") is not None]
+
+    def place(rng):
+        lat, lon = rng.choice(places)
+        return {"lat": round(lat, 4), "lon": round(lon, 4)}
+
+    def events(rng):
+        articles = rng.sample(source, 10)
+        return None, [
+            {"article_id": a["id"], "event_type": rng.choice(["view", "click"]),
+             "location": {"lat": a["latitude"], "lon": a["longitude"]}}
+            for a in articles
+        ]
+
+    return [
+        Scenario("category", "GET", "/category", lambda rng: ({"value": rng.choice(categories)}, None)),
+        Scenario("category_total", "GET", "/category",
+                 lambda rng: ({"value": rng.choice(categories), "include_total": "true"}, None)),
+        Scenario("source", "GET", "/source", lambda rng: ({"name": rng.choice(sources)}, None)),
+        Scenario("score", "GET", "/score", lambda rng: ({"threshold": round(rng.uniform(0.3, 0.9), 2)}, None)),
+        Scenario("search", "GET", "/search", lambda rng: ({"query": " ".join(rng.sample(words, 2))}, None)),
+        Scenario("semantic", "GET", "/semantic",
+                 lambda rng: ({"query": " ".join(rng.choice(titles).split()[:6])}, None)),
+        Scenario("nearby", "GET", "/nearby", lambda rng: ({**place(rng), "radius": 100}, None)),
+        Scenario("trending", "GET", "/trending", lambda rng: ({**place(rng), "radius": 200}, None)),
+        Scenario("query_category", "GET", "/query", lambda rng: ({"query": f"{rng.choice(categories)} news"}, None)),
+        Scenario("query_nearby", "GET", "/query",
+                 lambda rng: ({"query": f"{rng.choice(words)} near me", **place(rng)}, None)),
+        Scenario("query_source", "GET", "/query",
+                 lambda rng: ({"query": f"latest {rng.choice(words)} news from {rng.choice(sources)}"}, None)),
+        Scenario("events", "POST", "/events", events),
+        # Replaces all events, so it runs after the read scenarios, a few times
+        Scenario("simulate", "POST", "/simulate", lambda rng: ({"count": 200}, None), max_requests=10),
+        Scenario("stats", "GET", "/stats", lambda rng: (None, None)),
+    ]
+
+
+def percentile(ordered: list, q: float) -> float:
+    # Nearest-rank percentile of an ascending list
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def llm_counts() -> dict:
+    stats = context.llm_gateway.stats()
+    return {"requests": stats["requests"], "provider_calls": stats["provider_calls"]}
+
+
+async def settle():
+    # Late summaries and buffered event writes happen after their responses; count them towards their scenario
+    await context.event_buffer.flush()
+    deadline = time.monotonic() + SETTLE_SECONDS
+    while context.llm_gateway.stats()["in_flight"] and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int,
+                       rng: random.Random, counter: MongoOperationCounter) -> dict:
+    count = min(requests, scenario.max_requests or requests)
+    pending = iter([scenario.make_request(rng) for _ in range(count)])
+    latencies, statuses = [], Counter()
+
+    async def worker():
+        for params, body in pending:
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, API_PREFIX + scenario.path, params=params, json=body)
+                statuses[str(response.status_code)] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    mongo_before, llm_before = counter.snapshot(), llm_counts()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, count))))
+    elapsed = time.perf_counter() - started
+    await settle()
+    mongo_calls, llm_after = counter.snapshot() - mongo_before, llm_counts()
+
+    latencies.sort()
+    errors = sum(n for status, n in statuses.items() if not status.isdigit() or int(status) >= 400)
+    return {
+        "requests": count,
+        "errors": errors,
+        "status_codes": dict(sorted(statuses.items())),
+        "throughput_rps": round(count / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "mean": round(statistics.fmean(latencies), 2),
+            "max": round(latencies[-1], 2)
+        },
+        "mongo_ops_per_request": round(sum(mongo_calls.values()) / count, 2),
+        "mongo_ops_by_name": {name: round(n / count, 2) for name, n in sorted(mongo_calls.items())},
+        "llm_requests_per_request": round((llm_after["requests"] - llm_before["requests"]) / count, 2),
+        "llm_provider_calls_per_request": round((llm_after["provider_calls"] - llm_before["provider_calls"]) / count, 2)
+    }
+
+
+async def drive(application, scenarios: list, args, counter: MongoOperationCounter) -> dict:
+    rng = random.Random(args.seed)
+    results = {}
+    async with application.router.lifespan_context(application):
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for scenario in scenarios:
+                if args.warmup:
+                    await run_scenario(client, scenario, args.warmup, args.concurrency, rng, counter)
+                results[scenario.name] = run = await run_scenario(
+                    client, scenario, args.requests, args.concurrency, rng, counter
+                )
+                logger.info(
+                    f"{scenario.name}: p50 {run['latency_ms']['p50']}ms p99 {run['latency_ms']['p99']}ms, "
+                    f"{run['throughput_rps']} req/s, {run['errors']} errors"
+                )
+    return results
+
+
+def embed_corpus(db) -> dict:
+    # As `manage.py embed` would: the app only memory-maps embeddings written beforehand
+    started = time.perf_counter()
+    encoder = create_encoder(os.environ["SEMANTIC_ENCODER"])
+    index = embed_articles(db["articles"], encoder, os.environ["SEMANTIC_INDEX_PATH"])
+    return {"articles": len(index), "seconds": round(time.perf_counter() - started, 3)}
+
+
+def run_size(size: int, source: list, scenarios: list, args, mongo_client, counter: MongoOperationCounter) -> dict:
+    db_name = f"{args.db}_{size}"
+    os.environ["DB_NAME"] = db_name
+    if args.redis == "fakeredis":
+        app_module.redis = use_fakeredis()
+    else:
+        os.environ["REDIS_URL"] = args.redis
+
+    db = mongo_client[db_name]
+    events = round(size * args.events_per_article)
+    if args.reuse and db["articles"].estimated_document_count() == size:
+        logger.info(f"Reusing the {size} articles in {db_name}")
+        seeded = {"articles": size, "reused": True}
+    else:
+        seeded = seed_articles(db, source, size, args.seed)
+    seeded_events = seed_events(db, source, size, events, args.seed)
+    embedded = embed_corpus(db) if os.getenv("SEMANTIC_SEARCH", "true").lower() == "true" else None
+
+    started = time.perf_counter()
+    application = app_module.App().get_app()
+    startup_seconds = time.perf_counter() - started
+
+    routes = asyncio.run(drive(application, scenarios, args, counter))
+    if args.mongo == "mongomock":
+        mongo_client.drop_database(db_name)
+    return {
+        "articles": size,
+        "events": events,
+        "seed": {"articles": seeded, "events": seeded_events, "embeddings": embedded},
+        "startup_seconds": round(startup_seconds, 3),
+        "settings": {
+            "async_mode": context.async_mode,
+            "search_backend": context.search_backend.name,
+            "nearby_backend": context.nearby_backend,
+            "trending_backend": context.trending_backend,
+            "semantic_search": context.semantic_index is not None,
+            "summary_batch_size": context.summary_batch_size
+        },
+        "routes": routes
+    }
+
+
+def configure_environment(args):
+    # load_dotenv (in App) keeps variables that are already set, so these win over configs/.env
+    os.environ.update({
+        "LLM_PROVIDER": "fake",
+        "FAKE_LLM_LATENCY": args.llm_latency,
+        "FAKE_LLM_ERROR_RATE": str(args.llm_error_rate),
+        "FAKE_LLM_SEED": str(args.seed),
+        # The fake has no quota; rate limits would only measure the token buckets
+        "LLM_REQUESTS_PER_MINUTE": "0",
+        "LLM_TOKENS_PER_MINUTE": "0",
+        # Embeddings written by `manage.py embed` belong to another database; each corpus is embedded here
+        "SEMANTIC_INDEX_PATH": os.path.join(tempfile.mkdtemp(prefix="load_test_"), "embeddings"),
+        "SEMANTIC_ENCODER": os.getenv("SEMANTIC_ENCODER", "hashing"),
+    })
+    if args.mongo == "mongomock":
+        os.environ.update({
+            "ASYNC_MODE": "false",
+            "SEARCH_BACKEND": "bm25",
+            "NEARBY_BACKEND": "memory",
+            "TRENDING_BACKEND": "engine"
+        })
+    if args.no_cache:
+        os.environ.update({"SUMMARY_CACHE_BYPASS": "true", "EXTRACTION_CACHE_BYPASS": "true"})
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _change_pct(new: float, old: float) -> float | None:
+    return round(100 * (new - old) / old, 1) if old else None
+
+
+def compare(results: dict, baseline: dict):
+    """Adds vs_baseline (percentage changes) to each scenario that the baseline also ran."""
+    baseline_runs = {run["articles"]: run for run in baseline.get("runs", [])}
+    for run in results["runs"]:
+        previous_routes = baseline_runs.get(run["articles"], {}).get("routes", {})
+        for name, route in run["routes"].items():
+            previous = previous_routes.get(name)
+            if previous is None:
+                continue
+            route["vs_baseline"] = {
+                **{q: _change_pct(route["latency_ms"][q], previous["latency_ms"][q]) for q in ("p50", "p95", "p99")},
+                "throughput_rps": _change_pct(route["throughput_rps"], previous["throughput_rps"]),
+                "mongo_ops_per_request": _change_pct(route["mongo_ops_per_request"], previous["mongo_ops_per_request"]),
+                "llm_provider_calls_per_request": _change_pct(
+                    route["llm_provider_calls_per_request"], previous["llm_provider_calls_per_request"]
+                )
+            }
+    results["baseline_commit"] = baseline.get("commit")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data/news_data.json")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000], help="Articles per corpus, e.g. 2000 100000")
+    parser.add_argument("--events-per-article", type=float, default=0.5)
+    parser.add_argument("--mongo", default="mongomock", help="mongomock or a mongodb:// URI")
+    parser.add_argument("--db", default="news_bench", help="Database name prefix (suffixed with the corpus size)")
+    parser.add_argument("--reuse", action="store_true", help="Keep an already seeded corpus of the same size")
+    parser.add_argument("--redis", default="fakeredis", help="fakeredis or a redis:// URL")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=0, help="Unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenarios", nargs="+", help="Run only these scenarios")
+    parser.add_argument("--llm-latency", default="lognormal:300:0.5", help="FAKE_LLM_LATENCY")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="FAKE_LLM_ERROR_RATE")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the summary and extraction caches")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--output", help="Write results here instead of stdout")
+    args = parser.parse_args()
+
+    if args.mongo == "mongomock" and max(args.sizes) > 100000:
+        logger.warning("mongomock keeps the corpus in memory and serializes every call; use a local mongod past 100k")
+
+    configure_environment(args)
+    counter = MongoOperationCounter()
+    if args.mongo == "mongomock":
+        mongo_client = use_mongomock(counter)
+        app_module.MongoClient = lambda *a, **k: mongo_client
+    else:
+        monitoring.register(counter)
+        mongo_client = MongoClient(args.mongo)
+        os.environ["MONGO_URI"] = args.mongo
+
+    source = load_source_articles(args.data)
+    scenarios = build_scenarios(source)
+    if args.scenarios:
+        scenarios = [scenario for scenario in scenarios if scenario.name in args.scenarios]
+
+    results = {
+        "benchmark": "load_test",
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "mongo": "mongomock" if args.mongo == "mongomock" else "mongod",
+            "redis": "fakeredis" if args.redis == "fakeredis" else "redis",
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "llm_latency": args.llm_latency,
+            "llm_error_rate": args.llm_error_rate,
+            "caches": not args.no_cache,
+            "seed": args.seed
+        },
+        "runs": [run_size(size, source, scenarios, args, mongo_client, counter) for size in args.sizes]
+    }
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        logger.info(f"Wrote results to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Micro-benchmark: article page payloads and serialization cost, before and after response models.
+
+Compares, per page of articles from data/news_data.json:
+  * BSON bytes MongoDB sends for full documents vs ARTICLE_PROJECTION
+  * the previous response path (jsonable_encoder + JSONResponse) vs the response_model path
+    (pydantic-core validate/serialize + ORJSONResponse): time, peak allocation and body size
+
+Usage:
+    python -m benchmarks.response_bench [--limit 20] [--iterations 500]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+
+import bson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.schemas import ArticlePage
+from app.services.articles import ARTICLE_PROJECTION, format_article
+from app.services.utils import normalize_key, to_geo_point
+
+SUMMARY = "A short LLM generated summary of the article that is roughly as long as the real ones. " * 3
+
+
+def load_documents(path):
+    # Articles as stored in MongoDB once loaded, summarized and indexed
+    with open(path, "r", encoding="utf-8") as f:
+        articles = json.load(f)
+
+    documents = []
+    for article in articles:
+        article["_id"] = ObjectId()
+        article["publication_date"] = datetime.fromisoformat(article["publication_date"])
+        article["location"] = to_geo_point(article["latitude"], article["longitude"])
+        article["category_norm"] = [normalize_key(c) for c in article["category"]]
+        article["source_norm"] = normalize_key(article["source_name"])
+        article["llm_summary"] = SUMMARY
+        article["summary_hash"] = "0" * 64
+        article["summarized_at"] = datetime.utcnow()
+        documents.append(article)
+    return documents
+
+
+def project(document):
+    return {field: document[field] for field in ("_id", *ARTICLE_PROJECTION) if field in document}
+
+
+def render_before(page):
+    return JSONResponse(jsonable_encoder(page)).body
+
+
+def render_after(page, adapter):
+    # What FastAPI does for a route with response_model and ORJSONResponse
+    value = adapter.validate_python(page)
+    return ORJSONResponse(adapter.dump_python(value, mode="json", by_alias=True)).body
+
+
+def measure(fn, pages, iterations):
+    timings = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        fn(pages[i % len(pages)])
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    peaks = []
+    for page in pages[:50]:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn(page)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "peak_alloc_kb": round(statistics.fmean(peaks) / 1024, 1),
+        "body_bytes": len(fn(pages[0]))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data/news_data.json")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    documents = load_documents(args.data)
+    samples = [random.sample(documents, args.limit) for _ in range(100)]
+
+    full_bytes = statistics.fmean(sum(len(bson.encode(d)) for d in docs) for docs in samples)
+    projected_bytes = statistics.fmean(sum(len(bson.encode(project(d))) for d in docs) for docs in samples)
+
+    pages = [
+        {
+            "articles": [format_article(project(d), d["llm_summary"]) for d in docs],
+            "metadata": {"limit": args.limit, "next_cursor": "eyJhZnRlciI6W119"}
+        }
+        for docs in samples
+    ]
+    adapter = TypeAdapter(ArticlePage)
+    before = measure(render_before, pages, args.iterations)
+    after = measure(lambda page: render_after(page, adapter), pages, args.iterations)
+
+    print(json.dumps({
+        "articles_per_page": args.limit,
+        "mongo_bson_bytes_per_page": {
+            "full_documents": round(full_bytes),
+            "projected": round(projected_bytes),
+            "saved_pct": round(100 * (1 - projected_bytes / full_bytes), 1)
+        },
+        "serialization": {
+            "jsonable_encoder_json": before,
+            "response_model_orjson": after,
+            "speedup_p50": round(before["p50_ms"] / after["p50_ms"], 1) if after["p50_ms"] else None
+        }
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,93 @@
-if __name__ == "__main__":
+import argparse
+
+
+def runserver(args):
     import uvicorn
 
-    uvicorn.run("app.main:app", host="localhost", port=8000)
\ No newline at end of file
+    uvicorn.run("app.main:app", host=args.host, port=args.port)
+
+
+def summarize(args):
+    import asyncio
+
+    from app import App
+    from app.services.summarization import summarize_pending_articles
+
+    App()
+    asyncio.run(summarize_pending_articles(
+        batch_size=args.batch_size,
+        max_workers=args.workers,
+        max_retries=args.max_retries,
+        force=args.force
+    ))
+
+
+def load(args):
+    import os
+
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    from app.services.load_data import backfill_articles, ensure_article_indexes, load_articles
+
+    # Only MongoDB is needed: no App() startup, search indexes or LLM clients
+    load_dotenv(dotenv_path="configs/.env")
+    articles_collection = MongoClient(os.getenv("MONGO_URI"))[os.getenv("DB_NAME")]["articles"]
+    if args.indexes_only:
+        backfill_articles(articles_collection)
+        ensure_article_indexes(articles_collection)
+    else:
+        load_articles(articles_collection, args.path, batch_size=args.batch_size)
+
+
+def embed(args):
+    import os
+
+    from app import App
+    from app.services.embeddings import create_encoder
+    from app.services.semantic import embed_articles
+
+    os.environ["SEMANTIC_SEARCH"] = "false"  # the index is being rebuilt; don't load the old one
+    app = App()
+    encoder = create_encoder(args.encoder or os.getenv("SEMANTIC_ENCODER", "hashing"))
+    output = args.output or os.getenv("SEMANTIC_INDEX_PATH", "data/embeddings")
+    embed_articles(app.articles_collection, encoder, output, batch_size=args.batch_size)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Contextual News Retrieval management commands")
+    subparsers = parser.add_subparsers(dest="command")
+
+    server_parser = subparsers.add_parser("runserver", help="Start the FastAPI app (default)")
+    server_parser.add_argument("--host", default="localhost")
+    server_parser.add_argument("--port", type=int, default=8000)
+    server_parser.set_defaults(func=runserver)
+
+    summarize_parser = subparsers.add_parser("summarize", help="Pre-generate and store article summaries")
+    summarize_parser.add_argument("--batch-size", type=int, default=100)
+    summarize_parser.add_argument("--workers", type=int, default=4, help="Concurrent LLM requests")
+    summarize_parser.add_argument("--max-retries", type=int, default=5, help="Retries per article on rate limits")
+    summarize_parser.add_argument("--force", action="store_true", help="Re-summarize unchanged articles too")
+    summarize_parser.set_defaults(func=summarize)
+
+    load_parser = subparsers.add_parser("load", help="Load (upsert) articles from a JSON or NDJSON file")
+    load_parser.add_argument("path", nargs="?", default="data/news_data.json")
+    load_parser.add_argument("--batch-size", type=int, default=1000, help="Articles per bulk_write")
+    load_parser.add_argument("--indexes-only", action="store_true", help="Only backfill derived fields and build indexes")
+    load_parser.set_defaults(func=load)
+
+    embed_parser = subparsers.add_parser("embed", help="Compute article embeddings for semantic search")
+    embed_parser.add_argument("--batch-size", type=int, default=256)
+    embed_parser.add_argument("--encoder", help="Encoder spec (default: SEMANTIC_ENCODER)")
+    embed_parser.add_argument("--output", help="Index directory (default: SEMANTIC_INDEX_PATH)")
+    embed_parser.set_defaults(func=embed)
+
+    return parser
+
+
+if __name__ == "__main__":
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.command is None:
+        args = parser.parse_args(["runserver"])
+    args.func(args)
@@ -0,0 +1,110 @@
+"""Shared fixtures: mongomock and fakeredis stand in for MongoDB and Redis, and the app runs
+with the fake LLM provider, so the suite needs no services or API keys.
+
+mongomock has no $text or $geoNear, so the app fixture uses the in-process backends
+(bm25, memory, engine) and the blocking clients, like the load test does.
+"""
+import itertools
+import json
+import threading
+import types
+
+import fakeredis
+import mongomock
+import pytest
+from fastapi.testclient import TestClient
+from mongomock.collection import BulkOperationBuilder, Collection, Cursor
+from mongomock.command_cursor import CommandCursor
+
+import app as app_module
+from app.services.load_data import load_articles
+
+DATA_PATH = "data/news_data.json"
+SAMPLE_SIZE = 300
+
+# mongomock isn't thread-safe and the blocking clients run in the threadpool
+LOCKED_METHODS = (
+    "find", "find_one", "aggregate", "count_documents", "estimated_document_count", "distinct",
+    "insert_one", "insert_many", "update_one", "update_many", "bulk_write", "delete_many"
+)
+
+APP_ENV = {
+    "DB_NAME": "news_test",
+    "ASYNC_MODE": "false",
+    "SEARCH_BACKEND": "bm25",
+    "NEARBY_BACKEND": "memory",
+    "TRENDING_BACKEND": "engine",
+    "SEMANTIC_SEARCH": "false",
+    "LLM_PROVIDER": "fake",
+    "FAKE_LLM_LATENCY": "fixed:0",
+    "FAKE_LLM_TOKEN_MS": "0",
+    "LLM_REQUESTS_PER_MINUTE": "0",
+    "LLM_TOKENS_PER_MINUTE": "0",
+    "SUMMARY_CACHE_BYPASS": "true",
+    "EXTRACTION_CACHE_BYPASS": "true",
+}
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """A mongomock client, patched for what the app needs from PyMongo 4."""
+    lock = threading.RLock()
+
+    def locked(method):
+        def wrapper(*args, **kwargs):
+            with lock:
+                return method(*args, **kwargs)
+        return wrapper
+
+    def to_list(self, length=None):
+        with lock:
+            return list(itertools.islice(self, length)) if length else list(self)
+
+    def add_update(self, *args, sort=None, **kwargs):
+        # PyMongo 4.11+ passes UpdateOne's sort, which mongomock doesn't know
+        return original_add_update(self, *args, **kwargs)
+
+    original_add_update = BulkOperationBuilder.add_update
+    for name in LOCKED_METHODS:
+        monkeypatch.setattr(Collection, name, locked(getattr(Collection, name)))
+    monkeypatch.setattr(Cursor, "to_list", to_list, raising=False)
+    monkeypatch.setattr(CommandCursor, "to_list", to_list, raising=False)
+    monkeypatch.setattr(BulkOperationBuilder, "add_update", add_update)
+    return mongomock.MongoClient()
+
+
+@pytest.fixture
+def db(mongo):
+    return mongo[APP_ENV["DB_NAME"]]
+
+
+@pytest.fixture
+def sample_path(tmp_path):
+    with open(DATA_PATH, encoding="utf-8") as f:
+        articles = json.load(f)[:SAMPLE_SIZE]
+    path = tmp_path / "articles.json"
+    path.write_text(json.dumps(articles), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def articles_collection(db, sample_path):
+    load_articles(db["articles"], sample_path)
+    return db["articles"]
+
+
+@pytest.fixture
+def client(monkeypatch, mongo, articles_collection):
+    for name, value in APP_ENV.items():
+        monkeypatch.setenv(name, value)
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(app_module, "MongoClient", lambda *args, **kwargs: mongo)
+    monkeypatch.setattr(app_module, "redis", types.SimpleNamespace(
+        StrictRedis=types.SimpleNamespace(
+            from_url=lambda url, **kwargs: fakeredis.FakeStrictRedis(server=server, **kwargs)
+        )
+    ))
+
+    with TestClient(app_module.App().get_app()) as test_client:
+        yield test_client
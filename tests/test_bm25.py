@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+import app.context as context
+from app.services.bm25 import build_search_index
+from app.services.search_backend import BM25Search
+from app.services.utils import tokenize
+
+ARTICLES = [
+    {"_id": 1, "title": "Starlink launches in India", "description": "Satellite internet arrives.", "relevance_score": 0.5},
+    {"_id": 2, "title": "Telecom tariffs rise", "description": "Operators cite Starlink competition.", "relevance_score": 0.5},
+    {"_id": 3, "title": "Monsoon reaches Kerala", "description": "Rainfall expected to be above normal.", "relevance_score": 0.9},
+    {"_id": 4, "title": "Election results announced", "description": "Counting ends in Bihar.", "relevance_score": 0.4},
+]
+
+
+def ranked_keys(index, query: str) -> list:
+    keys, scores, _ = index.scores(query)
+    return [key for _, key in sorted(zip(scores, keys), reverse=True)]
+
+
+def test_tokenize_drops_stop_words_and_case():
+    assert tokenize("The Starlink launch in INDIA") == ["starlink", "launch", "india"]
+
+
+def test_title_matches_outrank_description_matches():
+    assert ranked_keys(build_search_index(ARTICLES), "starlink") == [1, 2]
+
+
+def test_prefixes_and_typos_match():
+    index = build_search_index(ARTICLES)
+    assert ranked_keys(index, "starl") == [1, 2]
+    assert ranked_keys(index, "elecion") == [4]
+    assert ranked_keys(index, "zzzz") == []
+
+
+def test_re_added_articles_replace_their_previous_version():
+    index = build_search_index(ARTICLES)
+    index.add_many([{**ARTICLES[0], "title": "Broadband plans", "description": "New plans."}])
+
+    assert len(index) == len(ARTICLES)
+    assert ranked_keys(index, "starlink") == [2]
+
+
+def test_replacing_an_article_takes_back_its_statistics():
+    replaced = build_search_index(ARTICLES)
+    replaced.add_many([{**ARTICLES[0], "title": "Broadband plans", "description": "New plans."}])
+    fresh = build_search_index([{**ARTICLES[0], "title": "Broadband plans", "description": "New plans."}, *ARTICLES[1:]])
+
+    assert replaced._doc_freq == fresh._doc_freq
+    assert replaced._length_totals == fresh._length_totals
+    assert "launches" not in replaced._doc_freq
+    keys, scores, _ = replaced.scores("starlink plans")
+    assert dict(zip(keys, scores)) == pytest.approx(dict(zip(*fresh.scores("starlink plans")[:2])))
+
+
+@pytest.fixture
+def bm25_collection(monkeypatch, db):
+    db["articles"].insert_many([dict(article) for article in ARTICLES])
+    monkeypatch.setattr(context, "async_mode", True)
+    monkeypatch.setattr(context, "articles_collection", db["articles"])
+    return db["articles"]
+
+
+def test_search_blends_relevance_and_pages_by_keyset(bm25_collection):
+    backend = BM25Search(bm25_collection, candidate_cap=0)
+
+    first = asyncio.run(backend.search("starlink", 1, {"title": 1}))
+    rest = asyncio.run(backend.search("starlink", 10, {"title": 1}, [first[0]["final_score"], first[0]["_id"]]))
+
+    assert [a["_id"] for a in first + rest] == [1, 2]
+    assert first[0]["score"] == 1.0
+    assert first[0]["final_score"] == pytest.approx(0.3 * 0.5 + 0.7 * 1.0)
+
+
+def test_match_filter_is_capped_to_the_best_matches(bm25_collection):
+    uncapped, capped = BM25Search(bm25_collection, 0), BM25Search(bm25_collection, 1)
+
+    assert asyncio.run(uncapped.match_filter("starlink")) == ({"_id": {"$in": [1, 2]}}, False)
+    assert asyncio.run(capped.match_filter("starlink")) == ({"_id": {"$in": [1]}}, True)
+
+
+def test_refresh_indexes_articles_inserted_since_the_build(bm25_collection):
+    backend = BM25Search(bm25_collection, candidate_cap=0)
+    bm25_collection.insert_one({"_id": 5, "title": "Starlink pricing revealed", "description": "", "relevance_score": 0.5})
+
+    assert asyncio.run(backend.refresh()) == 1
+    assert asyncio.run(backend.refresh()) == 0
+    assert asyncio.run(backend.match_filter("starlink")) == ({"_id": {"$in": [1, 2, 5]}}, False)
+    assert backend.stats()["documents"] == 5
@@ -0,0 +1,50 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import app.context as context
+from app.services.event_buffer import EventBuffer
+from app.services.trending_engine import TrendingEngine
+
+
+def event(article_id: str, **fields) -> dict:
+    return {"article_id": article_id, "event_type": "view", "timestamp": datetime.utcnow(),
+            "location": {"lat": 28.6, "lon": 77.2}, **fields}
+
+
+@pytest.fixture
+def engine(monkeypatch, db):
+    engine = TrendingEngine(cell_degrees=0.25, half_life_hours=6)
+    monkeypatch.setattr(context, "async_mode", True)
+    monkeypatch.setattr(context, "user_events_collection", db["user_events"])
+    monkeypatch.setattr(context, "trending_engine", engine)
+    monkeypatch.setattr(context, "event_geo_index", None)
+    return engine
+
+
+def flush(events: list) -> EventBuffer:
+    buffer = EventBuffer()
+
+    async def run():
+        await buffer.add_many(events)
+        await buffer.flush()
+
+    asyncio.run(run())
+    return buffer
+
+
+def test_flushed_events_reach_mongo_and_the_trending_engine(db, engine):
+    buffer = flush([event("a"), event("b")])
+
+    assert buffer.flushed == db["user_events"].count_documents({}) == 2
+    assert set(engine.scores(28.6, 77.2, 10)) == {"a", "b"}
+
+
+def test_partial_flush_only_counts_the_events_that_were_inserted(db, engine):
+    buffer = flush([event("a", _id=1), event("b", _id=1), event("c", _id=2)])
+
+    assert (buffer.flushed, buffer.dropped) == (2, 1)
+    assert db["user_events"].count_documents({}) == 2
+    assert engine.stats()["events_recorded"] == 2
+    assert set(engine.scores(28.6, 77.2, 10)) == {"a", "c"}
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+import app.context as context
+from app.services.llm_gateway import CircuitBreaker, LLMGateway, LLMUnavailable
+from app.services.llm_providers import FakeLLMClient, ProviderError, create_llm_client
+
+REQUEST = {"model": "test", "messages": [{"role": "user", "content": "Title: A\nDescription: B"}]}
+
+
+class ScriptedClient(FakeLLMClient):
+    """The fake provider, failing its first calls with the given errors."""
+
+    def __init__(self, *errors):
+        super().__init__(latency="fixed:0", token_ms=0)
+        self.errors = list(errors)
+        self.calls = 0
+        fake_create = self.chat.completions.create
+
+        async def create(**kwargs):
+            self.calls += 1
+            if self.errors:
+                raise self.errors.pop(0)
+            return await fake_create(**kwargs)
+
+        self.chat.completions.create = create
+
+
+@pytest.fixture(autouse=True)
+def async_clients(monkeypatch):
+    monkeypatch.setattr(context, "async_mode", True)
+
+
+def gateway(client, **options) -> LLMGateway:
+    options = {"requests_per_minute": 0, "tokens_per_minute": 0, "base_delay": 0, **options}
+    return LLMGateway(client, **options)
+
+
+def test_retries_retryable_errors():
+    client = ScriptedClient(ProviderError("busy", 503), ProviderError("slow down", 429))
+    llm = gateway(client, max_retries=2)
+
+    response = asyncio.run(llm.complete(**REQUEST))
+
+    assert response.choices[0].message.content
+    assert client.calls == 3
+    assert llm.retries == 2
+    assert llm.breaker.state == "closed"
+
+
+def test_client_errors_are_not_retried():
+    client = ScriptedClient(ProviderError("bad request", 400))
+    llm = gateway(client, max_retries=2)
+
+    with pytest.raises(ProviderError):
+        asyncio.run(llm.complete(**REQUEST))
+    assert client.calls == 1
+    assert llm.breaker.failures == 0
+
+
+def test_gives_up_after_max_retries():
+    client = ScriptedClient(*(ProviderError("down", 503) for _ in range(3)))
+    llm = gateway(client, max_retries=1)
+
+    with pytest.raises(ProviderError):
+        asyncio.run(llm.complete(**REQUEST))
+    assert client.calls == 2
+    assert llm.failures == 1
+
+
+def test_circuit_opens_then_closes_after_a_successful_trial():
+    client = ScriptedClient(*(ProviderError("down", 503) for _ in range(2)))
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    llm = gateway(client, max_retries=0, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(ProviderError):
+            asyncio.run(llm.complete(**REQUEST))
+    assert breaker.state == "open"
+
+    # Failing fast: the provider isn't called while the circuit is open
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(llm.complete(**REQUEST))
+    assert client.calls == 2
+
+    breaker.opened_at -= 60
+    assert breaker.state == "half_open"
+    asyncio.run(llm.complete(**REQUEST))
+    assert breaker.state == "closed"
+    assert client.calls == 3
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+
+    assert breaker.allow()
+    assert not breaker.allow()  # one trial at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_identical_concurrent_requests_share_one_call():
+    client = ScriptedClient()
+    llm = gateway(client)
+
+    async def run():
+        return await asyncio.gather(*(llm.complete(**REQUEST) for _ in range(5)))
+
+    responses = asyncio.run(run())
+    assert len({id(response) for response in responses}) == 1
+    assert client.calls == 1
+    assert llm.coalesced == 4
+
+
+def test_cancelled_trial_frees_the_half_open_slot():
+    client = ScriptedClient()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+    llm = gateway(client, breaker=breaker)
+
+    async def hang(**kwargs):
+        await asyncio.sleep(60)
+
+    async def run():
+        # Streaming calls aren't shielded, so cancelling the caller cancels the trial in flight
+        trial = asyncio.ensure_future(llm.complete(**REQUEST, stream=True))
+        await asyncio.sleep(0)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    client.chat.completions.create = hang
+    asyncio.run(run())
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_unknown_providers_are_rejected():
+    with pytest.raises(ValueError, match="Unknown LLM_PROVIDER: grok"):
+        create_llm_client("grok", True, {})
@@ -0,0 +1,54 @@
+import json
+
+from app.services.load_data import load_articles, missing_article_indexes
+
+ARTICLES = [
+    {
+        "id": "a1", "title": "Starlink launches in India", "description": "Satellite internet arrives.",
+        "category": [" Technology "], "source_name": "News18", "publication_date": "2025-03-01T10:00:00",
+        "relevance_score": 0.8, "latitude": 28.6, "longitude": 77.2
+    },
+    {
+        "id": "a2", "title": "Monsoon reaches Kerala", "description": "Rainfall above normal.",
+        "category": ["national"], "source_name": "Hindustan Times", "publication_date": "2025-03-02T08:00:00",
+        "relevance_score": 0.6, "latitude": 9.9, "longitude": 76.3
+    },
+]
+
+
+def write_articles(tmp_path, articles, name="articles.json") -> str:
+    path = tmp_path / name
+    path.write_text(json.dumps(articles), encoding="utf-8")
+    return str(path)
+
+
+def test_load_derives_fields_and_builds_indexes(db, tmp_path):
+    totals = load_articles(db["articles"], write_articles(tmp_path, ARTICLES))
+
+    assert (totals["read"], totals["inserted"]) == (2, 2)
+    article = db["articles"].find_one({"id": "a1"})
+    assert article["category_norm"] == ["technology"]
+    assert article["source_norm"] == "news18"
+    assert article["location"] == {"type": "Point", "coordinates": [77.2, 28.6]}
+    assert article["publication_date"].year == 2025
+    assert missing_article_indexes(db["articles"]) == []
+
+
+def test_reloading_upserts_instead_of_duplicating(db, tmp_path):
+    load_articles(db["articles"], write_articles(tmp_path, ARTICLES))
+    changed = [{**ARTICLES[0], "title": "Starlink gets its licence"}, ARTICLES[1]]
+
+    totals = load_articles(db["articles"], write_articles(tmp_path, changed, "changed.json"))
+
+    assert (totals["inserted"], totals["updated"], totals["unchanged"]) == (0, 1, 1)
+    assert db["articles"].count_documents({}) == 2
+    assert db["articles"].find_one({"id": "a1"})["title"] == "Starlink gets its licence"
+
+
+def test_repeated_ids_keep_the_last_version_and_records_without_id_are_skipped(db, tmp_path):
+    records = [ARTICLES[0], {**ARTICLES[0], "title": "Second version"}, {"title": "No id"}, "not an article"]
+
+    totals = load_articles(db["articles"], write_articles(tmp_path, records), batch_size=10)
+
+    assert (totals["read"], totals["inserted"], totals["skipped"]) == (4, 1, 2)
+    assert db["articles"].find_one({"id": "a1"})["title"] == "Second version"
@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import app.context as context
+from app.services.pagination import (
+    RELEVANCE_SORT, InvalidCursor, decode_cursor, decode_keyset, encode_cursor, find_page
+)
+
+
+def test_cursor_round_trip_keeps_bson_types():
+    state = {"tier": 2, "after": [datetime(2025, 3, 1, 12, 30), ObjectId()]}
+    assert decode_cursor(encode_cursor(state)) == state
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "W10"])  # not JSON; JSON but not an object ("[]")
+def test_decode_cursor_rejects_malformed_tokens(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("state", [{}, {"after": None}, {"after": "x"}, {"after": [0.5]}, {"after": [0.5, 1, 2]}])
+def test_decode_keyset_rejects_positions_of_the_wrong_width(state):
+    with pytest.raises(InvalidCursor):
+        decode_keyset(encode_cursor(state), len(RELEVANCE_SORT))
+
+
+def test_decode_keyset_without_cursor():
+    assert decode_keyset(None, len(RELEVANCE_SORT)) is None
+
+
+def test_find_page_walks_every_document_once_across_ties(monkeypatch, db):
+    collection = db["articles"]
+    collection.insert_many([{"relevance_score": i % 3 / 2} for i in range(23)])
+    monkeypatch.setattr(context, "async_mode", True)  # mongomock's calls are plain functions
+    monkeypatch.setattr(context, "articles_collection", collection)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = asyncio.run(find_page({}, RELEVANCE_SORT, 4, cursor, {"relevance_score": 1}))
+        assert len(page) <= 4
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    expected = sorted(collection.find(), key=lambda d: (d["relevance_score"], d["_id"]), reverse=True)
+    assert [d["_id"] for d in seen] == [d["_id"] for d in expected]
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from app.routes.query import _ranking_fetcher
+from app.services.pagination import InvalidCursor, encode_cursor
+
+API = "/api/v1/news"
+
+
+def walk(client, path: str, params: dict, max_pages: int = 50) -> tuple:
+    """Follows next_cursor from the first page; returns (article ids, last page's metadata)."""
+    ids, cursor = [], None
+    for _ in range(max_pages):
+        response = client.get(API + path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        ids.extend(article["_id"] for article in page["articles"])
+        cursor = page["metadata"]["next_cursor"]
+        if cursor is None:
+            break
+    return ids, page["metadata"]
+
+
+@pytest.mark.parametrize("path", ["/category?value=sports", "/source?name=News18", "/score?threshold=0.5", "/search?query=india"])
+@pytest.mark.parametrize("state", [{}, {"after": "x"}, {"after": [0.5]}])
+def test_malformed_cursors_are_rejected(client, path, state):
+    assert client.get(f"{API}{path}&cursor={encode_cursor(state)}").status_code == 400
+
+
+@pytest.mark.parametrize("state", [{"tier": "1"}, {"tier": 0, "after": "x"}, {"tier": 0, "after": [0.5, 1, 2]}])
+def test_malformed_query_cursors_are_rejected(client, state):
+    assert client.get(f"{API}/query", params={"query": "india", "cursor": encode_cursor(state)}).status_code == 400
+
+
+@pytest.mark.parametrize("after", [["x", 1], [None, 1]])
+def test_cursors_with_uncomparable_scores_are_rejected(client, after):
+    cursor = encode_cursor({"after": after})
+    assert client.get(f"{API}/search", params={"query": "india", "cursor": cursor}).status_code == 400
+
+
+def test_hybrid_ranking_rejects_uncomparable_cursors():
+    fetch = _ranking_fetcher([(ObjectId(), 0.5)])
+
+    with pytest.raises(InvalidCursor):
+        asyncio.run(fetch(5, ["x", ObjectId()]))
+
+
+def test_garbage_cursor_is_rejected(client):
+    assert client.get(f"{API}/category", params={"value": "sports", "cursor": "garbage"}).status_code == 400
+
+
+def test_category_pages_cover_every_match_once(client):
+    ids, _ = walk(client, "/category", {"value": "sports", "limit": 7})
+    assert ids
+    assert len(ids) == len(set(ids))
+
+    total = client.get(f"{API}/category", params={"value": "sports", "include_total": True}).json()
+    assert total["metadata"]["total_results"] == len(ids)
+
+
+def test_search_pages_cover_every_match_once(client):
+    ids, _ = walk(client, "/search", {"query": "india", "limit": 6})
+    total = client.get(f"{API}/search", params={"query": "india", "include_total": True}).json()
+
+    assert ids
+    assert len(ids) == len(set(ids)) == total["metadata"]["total_results"]
+
+
+def test_query_pages_list_each_article_once(client):
+    ids, metadata = walk(client, "/query", {"query": "india cricket news", "limit": 5})
+
+    assert ids
+    assert len(ids) == len(set(ids))
+    assert not metadata["partial"]
+
+
+def test_responses_carry_summaries_from_the_fake_provider(client):
+    page = client.get(f"{API}/score", params={"threshold": 0.5, "limit": 3}).json()
+
+    assert len(page["articles"]) == 3
+    assert all(article["llm_summary"] for article in page["articles"])
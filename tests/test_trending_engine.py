@@ -0,0 +1,56 @@
+import pytest
+
+from app.services.trending_engine import TrendingEngine
+
+HOUR = 3600
+NOW = 1_750_000_000.0
+
+
+@pytest.fixture
+def engine():
+    return TrendingEngine(cell_degrees=0.25, half_life_hours=6)
+
+
+def test_counters_halve_every_half_life(engine):
+    engine.record(28.6, 77.2, "a", 1.0, NOW)
+
+    assert engine.scores(28.6, 77.2, 10, now=NOW)["a"] == pytest.approx(1.0)
+    assert engine.scores(28.6, 77.2, 10, now=NOW + 6 * HOUR)["a"] == pytest.approx(0.5)
+    assert engine.scores(28.6, 77.2, 10, now=NOW + 12 * HOUR)["a"] == pytest.approx(0.25)
+
+
+def test_events_add_up_with_decay(engine):
+    engine.record(28.6, 77.2, "a", 1.0, NOW)
+    engine.record(28.6, 77.2, "a", 1.0, NOW + 6 * HOUR)
+    # Recorded out of order: decayed to the counter's newer reference time
+    engine.record(28.6, 77.2, "a", 1.0, NOW)
+
+    assert engine.scores(28.6, 77.2, 10, now=NOW + 6 * HOUR)["a"] == pytest.approx(2.0)
+
+
+def test_events_near_the_user_count_when_their_cell_centre_is_outside_the_radius(engine):
+    # The cell centre (28.125, 77.125) is ~18 km from the user; the event itself is ~150 m away
+    engine.record(28.001, 77.001, "a", 1.0, NOW)
+
+    assert engine.scores(28.0, 77.0, 10, now=NOW) == {"a": pytest.approx(1.0)}
+
+
+def test_far_cells_are_left_out(engine):
+    engine.record(29.0, 77.0, "far", 1.0, NOW)  # ~111 km north
+    engine.record(28.0, 77.0, "near", 1.0, NOW)
+
+    assert set(engine.scores(28.0, 77.0, 50, now=NOW)) == {"near"}
+
+
+def test_window_drops_counters_without_recent_events(engine):
+    engine.record(28.6, 77.2, "old", 1.0, NOW - 30 * HOUR)
+    engine.record(28.6, 77.2, "new", 1.0, NOW - HOUR)
+
+    assert set(engine.scores(28.6, 77.2, 10, max_age_hours=24, now=NOW)) == {"new"}
+
+
+def test_fully_decayed_counters_are_pruned(engine):
+    engine.record(28.6, 77.2, "a", 1.0, NOW)
+
+    assert engine.scores(28.6, 77.2, 10, now=NOW + 30 * 6 * HOUR) == {}
+    assert engine.stats()["counters"] == 0